@@ -0,0 +1,337 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import silnik
+from silnik import TrafficEngine, MINUT_NA_DOBE
+
+# Zestaw pomiarów wydajności na danych syntetycznych (powtarzalnych - stałe ziarna).
+#   python benchmark.py                      # skala "szybka"
+#   python benchmark.py --scale pelna        # do 50 tys. dni i 10 mln rekordów CDR
+#   python benchmark.py --save               # zapis wyników jako punkt odniesienia
+#   python benchmark.py --threshold 0.25     # regresja = wolniej o ponad 25% niż punkt odniesienia
+SKALE = {
+    "szybka": {"dni": (31, 365, 3650), "dni_poza_pamiecia": 10000, "pliki_csv": 365, "rekordy_cdr": 1_000_000,
+               "dni_symulacji": (31, 365)},
+    "pelna": {"dni": (31, 365, 3650), "dni_poza_pamiecia": 50000, "pliki_csv": 3650, "rekordy_cdr": 10_000_000,
+              "dni_symulacji": (31, 365, 3650)},
+}
+ZAKRESY = ((0, 24), (8, 16), (18, 22))
+PLIK_ODNIESIENIA = "benchmark_baseline.json"
+PROG_REGRESJI = 0.20
+KATALOG_PROGRAMU = os.path.dirname(os.path.abspath(__file__))
+
+
+# =============================================================================
+# GENERATORY DANYCH
+# =============================================================================
+def profil_doby():
+    """ Typowy kształt doby: szczyt przedpołudniowy i wieczorny, minimum w nocy """
+    t = np.arange(MINUT_NA_DOBE) / 60
+    return 5 + 40 * np.exp(-((t - 10.5) / 2.0) ** 2) + 30 * np.exp(-((t - 19) / 1.5) ** 2)
+
+
+def generuj_dni(liczba_dni, seed=0, out=None):
+    """ Macierz (dni x 1440) [Erl]: profil doby z przesunięciem, skalą dnia i szumem Poissona """
+    rng = np.random.default_rng(seed)
+    if out is None: out = np.empty((liczba_dni, MINUT_NA_DOBE))
+    profil = profil_doby()
+    for p in range(0, liczba_dni, 1024):
+        n = min(1024, liczba_dni - p)
+        przesuniecia = rng.integers(-60, 61, size=n)
+        skale = rng.normal(1, 0.1, size=n)
+        indeksy = (np.arange(MINUT_NA_DOBE) - przesuniecia[:, None]) % MINUT_NA_DOBE
+        out[p:p + n] = rng.poisson(profil[indeksy] * skale[:, None] * 10) / 10
+    return out
+
+
+def generuj_folder_csv(katalog, liczba_plikow, seed=0):
+    """ Folder plików dziennych ruch_YYYY-MM-DD.csv (separator ';' i przecinek dziesiętny, jak eksporty z central) """
+    os.makedirs(katalog, exist_ok=True)
+    dni = generuj_dni(liczba_plikow, seed)
+    start = np.datetime64('2020-01-01')
+    for i, dzien in enumerate(dni):
+        tekst = "minuta;ruch_erl\n" + "".join(f"{m + 1};{v:.1f}\n".replace('.', ',') for m, v in enumerate(dzien))
+        with open(os.path.join(katalog, f"ruch_{start + i}.csv"), 'w') as f:
+            f.write(tekst)
+    return katalog
+
+
+def generuj_cdr(sciezka, liczba_rekordow, liczba_dni=30, liczba_wiazek=16, seed=0):
+    """ Plik CDR (start, czas_trwania [s], wiazka) o rozkładzie startów zgodnym z profilem doby """
+    rng = np.random.default_rng(seed)
+    profil = profil_doby() / profil_doby().sum()
+    poczatek = np.datetime64('2024-01-01T00:00:00', 's').astype(np.int64)
+    with open(sciezka, 'w') as f:
+        f.write("start,czas_trwania,wiazka\n")
+        for p in range(0, liczba_rekordow, 1_000_000):
+            n = min(1_000_000, liczba_rekordow - p)
+            minuty = rng.choice(MINUT_NA_DOBE, size=n, p=profil)
+            sekundy = poczatek + rng.integers(0, liczba_dni, size=n) * 86400 + minuty * 60 + rng.integers(0, 60, n)
+            czas = rng.exponential(120, size=n).round(1)
+            wiazki = rng.integers(0, liczba_wiazek, size=n)
+            np.savetxt(f, np.column_stack([sekundy, czas, wiazki]), fmt=("%d", "%.1f", "%d"), delimiter=",")
+    return sciezka
+
+
+# =============================================================================
+# POMIAR
+# =============================================================================
+def zmierz(nazwa, funkcja, jednostki=None, opis_jednostki=None, powtorzenia=3, przygotuj=None, rozgrzewka=True):
+    """ Najlepszy czas z powtórzeń (bez tracemalloc) i szczyt pamięci z osobnego przebiegu pod tracemalloc
+
+    Przebieg rozgrzewkowy (nieliczony) zdejmuje z pomiaru leniwe importy i pierwsze alokacje.
+    """
+    if rozgrzewka:
+        if przygotuj: przygotuj()
+        funkcja()
+    czasy = []
+    for _ in range(powtorzenia):
+        if przygotuj: przygotuj()
+        gc.collect()
+        t0 = time.perf_counter()
+        funkcja()
+        czasy.append(time.perf_counter() - t0)
+
+    if przygotuj: przygotuj()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        funkcja()
+        _, szczyt = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    czas = min(czasy)
+    wynik = {"nazwa": nazwa, "czas_s": czas, "czas_mediana_s": float(np.median(czasy)),
+             "pamiec_szczyt_mb": szczyt / 2 ** 20}
+    if jednostki:
+        wynik["przepustowosc"] = jednostki / czas if czas > 0 else float('inf')
+        wynik["jednostka"] = opis_jednostki
+    print(_wiersz(wynik), flush=True)
+    return wynik
+
+
+def udane(wynik):
+    """ Przepuszcza wynik (ok, msg) metod silnika - nieudane wczytanie przerywa pomiar zamiast mierzyć błąd """
+    ok, msg = wynik
+    if not ok: raise RuntimeError(msg)
+    return wynik
+
+
+def nowe_dane(engine):
+    """ Jak po wczytaniu: nowa wersja magazynu unieważnia indeks, piramidę i krzywe wykresu (bez kopiowania dni) """
+    engine.magazyn.wersja += 1
+
+
+def _wiersz(wynik):
+    tekst = f"{wynik['nazwa']:<56} {wynik['czas_s'] * 1000:>10.1f} ms {wynik['pamiec_szczyt_mb']:>9.1f} MB"
+    if "przepustowosc" in wynik:
+        tekst += f"   {wynik['przepustowosc']:>12,.0f} {wynik['jednostka']}/s"
+    return tekst
+
+
+# =============================================================================
+# ZESTAWY
+# =============================================================================
+def zestaw_wczytywania(skala, katalog, powtorzenia):
+    wyniki = []
+    folder = generuj_folder_csv(os.path.join(katalog, "csv"), skala["pliki_csv"])
+    liczba = skala["pliki_csv"]
+    cache = os.path.join(katalog, "cache")
+
+    engine = TrafficEngine()
+    wyniki.append(zmierz(f"wczytaj_folder_csv {liczba} plików (bez cache)",
+                         lambda: udane(engine.wczytaj_folder_csv(folder, cache=False)), liczba, "plików", powtorzenia))
+    udane(engine.wczytaj_folder_csv(folder, katalog_cache=cache))
+    wyniki.append(zmierz(f"wczytaj_folder_csv {liczba} plików (cache)",
+                         lambda: udane(engine.wczytaj_folder_csv(folder, katalog_cache=cache)), liczba, "plików",
+                         powtorzenia))
+
+    rekordy = skala["rekordy_cdr"]
+    plik_cdr = generuj_cdr(os.path.join(katalog, "cdr.csv"), rekordy)
+    wyniki.append(zmierz(f"wczytaj_cdr {rekordy:,} rekordów", lambda: udane(engine.wczytaj_cdr(plik_cdr)), rekordy,
+                         "rekordów", max(1, powtorzenia - 1), rozgrzewka=False))
+    wyniki.append(zmierz(f"wczytaj_cdr {rekordy:,} rekordów (wiązki)",
+                         lambda: udane(engine.wczytaj_cdr(plik_cdr, kolumna_encji="wiazka")), rekordy, "rekordów",
+                         max(1, powtorzenia - 1), rozgrzewka=False))
+    return wyniki
+
+
+def zestaw_symulacji(skala, katalog, powtorzenia):
+    wyniki = []
+    engine = TrafficEngine()
+    czas = os.path.join(KATALOG_PROGRAMU, "czas_obslugi.txt")
+    intensywnosc = os.path.join(KATALOG_PROGRAMU, "intensywnosc_wywolan.txt")
+    for dni in skala["dni_symulacji"]:
+        wyniki.append(zmierz(f"wczytaj_baze_i_symuluj {dni} dni",
+                             lambda: udane(engine.wczytaj_baze_i_symuluj(czas, intensywnosc, ile_dni=dni, seed=1)), dni,
+                             "dni", powtorzenia))
+
+    pula, profil = silnik.wczytaj_baze_symulacji(czas, intensywnosc)
+    wiersz = np.empty(MINUT_NA_DOBE)
+    rng = np.random.default_rng(1)
+    wyniki.append(zmierz("_symuluj_dzien x100",
+                         lambda: [engine._symuluj_dzien(pula, profil, len(pula), wiersz, rng) for _ in range(100)],
+                         100, "dni", powtorzenia))
+    return wyniki
+
+
+def zestaw_analizy(skala, katalog, powtorzenia):
+    wyniki = []
+    for dni in skala["dni"]:
+        engine = TrafficEngine()
+        engine.magazyn.dodaj_dni(generuj_dni(dni, seed=dni))
+        for s, e in ZAKRESY:
+            wyniki.append(zmierz(f"oblicz_gnr {dni} dni {s}-{e} (nowy indeks)", lambda: engine.oblicz_gnr(s, e),
+                                 dni, "dni", powtorzenia, przygotuj=lambda: nowe_dane(engine)))
+        # Każdy zakres liczony od nowa - wyniki indeksu są zapamiętywane, więc powtórzenie zaczyna od nowych danych
+        wszystkie = [(s, e) for s in range(24) for e in range(s + 1, 25)]
+        wyniki.append(zmierz(f"oblicz_gnr {dni} dni, {len(wszystkie)} zakresów OD-DO (nowy indeks)",
+                             lambda: [engine.oblicz_gnr(s, e) for s, e in wszystkie], len(wszystkie), "zakresów",
+                             powtorzenia, przygotuj=lambda: nowe_dane(engine)))
+        skumulowane = engine.indeks().skumulowane
+        wyniki.append(zmierz(f"bootstrap_gnr {dni} dni x 1000 prób",
+                             lambda: silnik.bootstrap_gnr(skumulowane, 8, 16, 1000, seed=1), 1000, "prób",
+                             max(1, powtorzenia - 1)))
+
+    dni = skala["dni_poza_pamiecia"]
+    sciezka = os.path.join(katalog, "dni.npy")
+    generuj_dni(dni, seed=7, out=np.lib.format.open_memmap(sciezka, mode='w+', shape=(dni, MINUT_NA_DOBE)))
+    engine = TrafficEngine()
+    wyniki.append(zmierz(f"oblicz_gnr_poza_pamiecia {dni} dni 8-16",
+                         lambda: engine.oblicz_gnr_poza_pamiecia(sciezka, 8, 16), dni, "dni", 1, rozgrzewka=False))
+
+    obciazenia = np.random.default_rng(0).uniform(1, 2000, 10000)
+    wyniki.append(zmierz("wymiaruj_obciazenia 10k wiązek (nowa tablica)",
+                         lambda: silnik.wymiaruj_obciazenia(obciazenia, 0.01), len(obciazenia), "wiązek",
+                         powtorzenia, przygotuj=silnik._TABLICE_ERLANGA.clear))
+    wyniki.append(zmierz("wymiaruj_obciazenia 10k wiązek (tablica w pamięci)",
+                         lambda: silnik.wymiaruj_obciazenia(obciazenia, 0.01), len(obciazenia), "wiązek",
+                         powtorzenia))
+    return wyniki
+
+
+def zestaw_wykresu(skala, katalog, powtorzenia):
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from wykres import WykresProfilu
+
+    wyniki = []
+    for dni in skala["dni"]:
+        engine = TrafficEngine()
+        engine.magazyn.dodaj_dni(generuj_dni(dni, seed=dni))
+        wynik = engine.oblicz_gnr(8, 16)
+        fig = Figure(figsize=(10, 6), dpi=100)
+        FigureCanvasAgg(fig)
+        wykres = WykresProfilu(fig, fig.add_subplot(111))
+
+        def rysuj_wykres_glowny(tcbh_start):
+            # Jak TrafficAnalyzerApp.rysuj_wykres_glowny - piramida z silnika, przebudowa tylko po zmianie danych
+            wykres.rysuj(engine.magazyn, tcbh_start, 8, 16, engine.piramida())
+
+        def pelne():
+            rysuj_wykres_glowny(wynik["tcbh_start"])
+            fig.canvas.draw()
+
+        wyniki.append(zmierz(f"rysuj_wykres_glowny {dni} dni (przebudowa)", pelne, dni, "dni", powtorzenia,
+                             przygotuj=lambda: nowe_dane(engine)))
+        pelne()
+        starty = [(wynik["tcbh_start"] + 7 * i) % 1300 for i in range(50)]
+        wyniki.append(zmierz(f"rysuj_wykres_glowny {dni} dni (znaczniki x50)",
+                             lambda: [rysuj_wykres_glowny(t) for t in starty], 50, "klatek", powtorzenia))
+    return wyniki
+
+
+ZESTAWY = {
+    "wczytywanie": zestaw_wczytywania,
+    "symulacja": zestaw_symulacji,
+    "analiza": zestaw_analizy,
+    "wykres": zestaw_wykresu,
+}
+
+
+# =============================================================================
+# PUNKT ODNIESIENIA I REGRESJE
+# =============================================================================
+def porownaj(wyniki, odniesienie, prog):
+    """ Lista (nazwa, czas odniesienia, czas, zmiana) dla pomiarów wolniejszych o więcej niż prog """
+    stare = {w["nazwa"]: w for w in odniesienie.get("wyniki", [])}
+    regresje = []
+    for w in wyniki:
+        stary = stare.get(w["nazwa"])
+        if not stary or stary["czas_s"] <= 0: continue
+        zmiana = w["czas_s"] / stary["czas_s"] - 1
+        if zmiana > prog: regresje.append((w["nazwa"], stary["czas_s"], w["czas_s"], zmiana))
+    return regresje
+
+
+def opis_srodowiska():
+    return {"python": platform.python_version(), "numpy": np.__version__, "system": platform.platform(),
+            "procesor": platform.processor() or platform.machine(), "rdzenie": os.cpu_count()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmark.py", description="TrafficAnalyzer - pomiary wydajności")
+    parser.add_argument("--scale", choices=list(SKALE), default="szybka")
+    parser.add_argument("--only", help="tylko wybrane zestawy, np. analiza,wykres (" + ", ".join(ZESTAWY) + ")")
+    parser.add_argument("--repeat", type=int, default=3, help="liczba powtórzeń (liczy się najlepszy czas)")
+    parser.add_argument("--baseline", default=PLIK_ODNIESIENIA, help="plik punktu odniesienia (JSON)")
+    parser.add_argument("--save", action="store_true", help="zapisz wyniki jako nowy punkt odniesienia")
+    parser.add_argument("--threshold", type=float, default=PROG_REGRESJI, help="próg regresji (0.2 = +20%%)")
+    parser.add_argument("--json", help="zapisz pełne wyniki do pliku JSON")
+    args = parser.parse_args(argv)
+
+    wybrane = args.only.split(",") if args.only else list(ZESTAWY)
+    nieznane = [z for z in wybrane if z not in ZESTAWY]
+    if nieznane: parser.error(f"nieznany zestaw: {', '.join(nieznane)}")
+
+    skala = SKALE[args.scale]
+    katalog = tempfile.mkdtemp(prefix="traffic_benchmark_")
+    wyniki = []
+    try:
+        for nazwa in wybrane:
+            print(f"--- {nazwa} ---", flush=True)
+            wyniki += ZESTAWY[nazwa](skala, katalog, args.repeat)
+    finally:
+        shutil.rmtree(katalog, ignore_errors=True)
+
+    raport = {"skala": args.scale, "srodowisko": opis_srodowiska(), "wyniki": wyniki}
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(raport, f, ensure_ascii=False, indent=2)
+
+    kod = 0
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline, encoding='utf-8') as f:
+            odniesienie = json.load(f)
+        if odniesienie.get("skala") != args.scale:
+            print(f"Punkt odniesienia dla skali '{odniesienie.get('skala')}' - pomijam porównanie.")
+        else:
+            regresje = porownaj(wyniki, odniesienie, args.threshold)
+            for nazwa, stary, nowy, zmiana in regresje:
+                print(f"REGRESJA {nazwa}: {stary * 1000:.1f} ms -> {nowy * 1000:.1f} ms (+{zmiana:.0%})")
+            if regresje:
+                kod = 1
+            else:
+                print(f"Brak regresji powyżej {args.threshold:.0%} względem {args.baseline}.")
+    if args.save:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(raport, f, ensure_ascii=False, indent=2)
+        print(f"Zapisano punkt odniesienia: {args.baseline}")
+    return kod
+
+
+if __name__ == "__main__":
+    sys.exit(main())
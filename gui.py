@@ -0,0 +1,476 @@
+import customtkinter as ctk
+from tkinter import filedialog, messagebox, simpledialog
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+import warnings
+import os
+import sys
+import subprocess  # Niezbędne dla macOS
+import threading
+import queue
+
+from silnik import BEZ_POMIAROW, Pomiary, TrafficEngine, formatuj_raport, profiluj, resource_path
+from wykres import WykresProfilu
+
+# Konfiguracja wyglądu
+ctk.set_appearance_mode("Dark")
+ctk.set_default_color_theme("blue")
+warnings.filterwarnings('ignore')
+
+
+# =============================================================================
+# PRACA W TLE
+# =============================================================================
+class Zadanie:
+    """ Operacja wykonywana w wątku roboczym: postęp, anulowanie i wynik """
+
+    def __init__(self, rodzaj, funkcja, po_zakonczeniu):
+        self.rodzaj = rodzaj
+        self.funkcja = funkcja
+        self.po_zakonczeniu = po_zakonczeniu
+        self.anuluj = threading.Event()
+        self.postep = None
+        self.wynik = None
+        self.blad = None
+        self.profil = None  # Tekst cProfile, gdy zadanie było profilowane
+
+    def zglos(self, zrobione, wszystkie, opis):
+        # Wywoływane z wątku roboczego - GUI tylko odczytuje ostatnią wartość w after()
+        self.postep = (zrobione, wszystkie, opis)
+
+
+class WatekRoboczy:
+    """ Jeden wątek w tle z kolejką zadań; wyniki odbiera wątek GUI przez odbierz() """
+
+    def __init__(self):
+        self._kolejka = queue.Queue()
+        self._gotowe = queue.Queue()
+        self.aktywne = []
+        threading.Thread(target=self._petla, daemon=True).start()
+
+    def zlec(self, zadanie, wypiera=()):
+        # Nowsze żądanie wypiera nieaktualne zadania (czekające i trwające)
+        for stare in self.aktywne:
+            if stare.rodzaj in wypiera: stare.anuluj.set()
+        self.aktywne.append(zadanie)
+        self._kolejka.put(zadanie)
+
+    def anuluj_wszystkie(self):
+        for zadanie in self.aktywne:
+            zadanie.anuluj.set()
+
+    def odbierz(self):
+        """ Zakończone zadania, których nie anulowano ani nie wyparto (wołać z wątku GUI) """
+        wyniki = []
+        while True:
+            try:
+                zadanie = self._gotowe.get_nowait()
+            except queue.Empty:
+                return wyniki
+            self.aktywne.remove(zadanie)
+            if not zadanie.anuluj.is_set(): wyniki.append(zadanie)
+
+    def postep(self):
+        for zadanie in self.aktywne:
+            if not zadanie.anuluj.is_set(): return zadanie
+        return None
+
+    def _petla(self):
+        while True:
+            zadanie = self._kolejka.get()
+            if not zadanie.anuluj.is_set():
+                try:
+                    zadanie.wynik = zadanie.funkcja(zadanie)
+                except Exception as e:
+                    zadanie.blad = e
+            self._gotowe.put(zadanie)
+
+
+# =============================================================================
+# GUI
+# =============================================================================
+class TrafficApp(ctk.CTk):
+    GOS = {"0.1%": 0.001, "0.5%": 0.005, "1%": 0.01, "2%": 0.02, "5%": 0.05}
+    # Szerokość binu w plikach pomiarowych [s]
+    BINY = {"10 s": 10, "1 min": 60, "15 min": 900, "1 h": 3600}
+
+    def __init__(self):
+        super().__init__()
+        self.title("TrafficAnalyzer")
+        self.geometry("1400x950")
+        self.minsize(1024, 800)
+
+        # Na macOS ikona jest ustawiana przez pakiet .app (Info.plist),
+        # a nie przez kod. Usunąłem wywołanie iconbitmap, bo na Macu często
+        # powoduje błędy z plikami .ico. PyInstaller zajmie się ikoną.
+
+        self._diagnostyka = False
+        self._profiluj_nastepne = False
+        self.engine = self._nowy_silnik()
+        self.robotnik = WatekRoboczy()
+
+        self.grid_columnconfigure(1, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        # === LEWE MENU ===
+        self.left_frame = ctk.CTkFrame(self, width=350, corner_radius=0)
+        self.left_frame.grid(row=0, column=0, sticky="nswe")
+
+        self.btn_help = ctk.CTkButton(self.left_frame, text="POMOC / INSTRUKCJA", command=self.otworz_pomoc,
+                                      fg_color="#3a7ebf", hover_color="#2a5e8f")
+        self.btn_help.grid(row=0, column=0, padx=20, pady=(20, 5), sticky="ew")
+
+        self.btn_doc = ctk.CTkButton(self.left_frame, text="📄 PEŁNA DOKUMENTACJA (PDF)",
+                                     command=self.otworz_pdf,
+                                     fg_color="#8e44ad", hover_color="#9b59b6")
+        self.btn_doc.grid(row=1, column=0, padx=20, pady=(0, 10), sticky="ew")
+
+        ctk.CTkLabel(self.left_frame, text="TRAFFIC ANALYZER", font=ctk.CTkFont(size=24, weight="bold")).grid(row=2,
+                                                                                                              column=0,
+                                                                                                              padx=20,
+                                                                                                              pady=(10,
+                                                                                                                    20))
+
+        # --- IMPORT ---
+        ctk.CTkLabel(self.left_frame, text="1. IMPORT DANYCH", font=ctk.CTkFont(size=14, weight="bold"),
+                     text_color="#aaaaaa").grid(row=3, column=0, padx=20, pady=(10, 5), sticky="w")
+
+        self.frame_import = ctk.CTkFrame(self.left_frame, fg_color="transparent")
+        self.frame_import.grid(row=4, column=0, padx=20, pady=10, sticky="ew")
+        self.btn_folder = ctk.CTkButton(self.frame_import, text="Wgraj Folder z Pomiarami (.csv)",
+                                        command=self.akcja_tryb_folder, fg_color="#2fa34e", hover_color="#25803d",
+                                        height=45)
+        self.btn_folder.pack(side="left", fill="x", expand=True)
+        self.combo_bin = ctk.CTkOptionMenu(self.frame_import, values=list(self.BINY), width=80)
+        self.combo_bin.set("1 min")
+        self.combo_bin.pack(side="right", padx=(10, 0))
+
+        self.btn_auto = ctk.CTkButton(self.left_frame, text="Symulacja (Auto)", command=self.akcja_tryb_auto,
+                                      fg_color="#3a7ebf", hover_color="#2a5e8f")
+        self.btn_auto.grid(row=5, column=0, padx=20, pady=5, sticky="ew")
+
+        # --- PARAMETRY ---
+        ctk.CTkLabel(self.left_frame, text="2. PARAMETRY ANALIZY", font=ctk.CTkFont(size=14, weight="bold"),
+                     text_color="#aaaaaa").grid(row=6, column=0, padx=20, pady=(20, 5), sticky="w")
+
+        self.frame_params = ctk.CTkFrame(self.left_frame, fg_color="transparent")
+        self.frame_params.grid(row=7, column=0, padx=20, pady=5, sticky="ew")
+
+        godziny = [str(i) for i in range(25)]
+
+        ctk.CTkLabel(self.frame_params, text="OD:").pack(side="left", padx=5)
+        self.combo_start = ctk.CTkOptionMenu(self.frame_params, values=godziny, width=60)
+        self.combo_start.set("0")
+        self.combo_start.pack(side="left", padx=5)
+
+        ctk.CTkLabel(self.frame_params, text="DO:").pack(side="left", padx=5)
+        self.combo_end = ctk.CTkOptionMenu(self.frame_params, values=godziny, width=60)
+        self.combo_end.set("24")
+        self.combo_end.pack(side="left", padx=5)
+
+        self.btn_recalc = ctk.CTkButton(self.frame_params, text="⟳ Przelicz", width=80,
+                                        command=self.aktualizuj_wyniki, fg_color="#555555", hover_color="#333333")
+        self.btn_recalc.pack(side="right", padx=10)
+
+        # --- DASHBOARD ---
+        ctk.CTkLabel(self.left_frame, text="3. WYNIKI (DASHBOARD)", font=ctk.CTkFont(size=14, weight="bold"),
+                     text_color="#aaaaaa").grid(row=8, column=0, padx=20, pady=(30, 5), sticky="w")
+
+        self.results_container = ctk.CTkFrame(self.left_frame, fg_color="transparent")
+        self.results_container.grid(row=9, column=0, padx=10, pady=5, sticky="ew")
+
+        self.card_tcbh = ctk.CTkFrame(self.results_container, fg_color="#2b2b2b", corner_radius=10, border_width=1,
+                                      border_color="#ff0055")
+        self.card_tcbh.pack(fill="x", pady=5)
+        ctk.CTkLabel(self.card_tcbh, text="TCBH (Pływająca)", font=("Arial", 12, "bold"), text_color="#aaaaaa").pack(
+            anchor="w", padx=10, pady=(5, 0))
+        self.val_tcbh = ctk.CTkLabel(self.card_tcbh, text="--.-- Erl", font=("Arial", 28, "bold"), text_color="#ffffff")
+        self.val_tcbh.pack(anchor="w", padx=10, pady=(0, 0))
+        self.time_tcbh = ctk.CTkLabel(self.card_tcbh, text="Czas: --:-- - --:--", font=("Arial", 12),
+                                      text_color="#ff0055")
+        self.time_tcbh.pack(anchor="w", padx=10, pady=(0, 5))
+
+        self.card_conf = ctk.CTkFrame(self.results_container, fg_color="#2b2b2b", corner_radius=10, border_width=1,
+                                      border_color="#f1c40f")
+        self.card_conf.pack(fill="x", pady=5)
+        ctk.CTkLabel(self.card_conf, text="Przedział Ufności (95%)", font=("Arial", 12, "bold"),
+                     text_color="#aaaaaa").pack(anchor="w", padx=10, pady=(5, 0))
+        self.val_conf = ctk.CTkLabel(self.card_conf, text="+/- --.-- Erl", font=("Arial", 18, "bold"),
+                                     text_color="#f1c40f")
+        self.val_conf.pack(anchor="w", padx=10, pady=(0, 10))
+
+        self.card_adph = ctk.CTkFrame(self.results_container, fg_color="#2b2b2b", corner_radius=10, border_width=1,
+                                      border_color="#555555")
+        self.card_adph.pack(fill="x", pady=5)
+        ctk.CTkLabel(self.card_adph, text="ADPH (Śr. Max)", font=("Arial", 12, "bold"), text_color="#aaaaaa").pack(
+            anchor="w", padx=10, pady=(5, 0))
+        self.val_adph = ctk.CTkLabel(self.card_adph, text="--.-- Erl", font=("Arial", 20, "bold"), text_color="#dddddd")
+        self.val_adph.pack(anchor="w", padx=10, pady=(0, 5))
+
+        self.card_fdmh = ctk.CTkFrame(self.results_container, fg_color="#2b2b2b", corner_radius=10, border_width=1,
+                                      border_color="#555555")
+        self.card_fdmh.pack(fill="x", pady=5)
+        ctk.CTkLabel(self.card_fdmh, text="FDMH (Zegarowa)", font=("Arial", 12, "bold"), text_color="#aaaaaa").pack(
+            anchor="w", padx=10, pady=(5, 0))
+        self.val_fdmh = ctk.CTkLabel(self.card_fdmh, text="--.-- Erl", font=("Arial", 20, "bold"), text_color="#dddddd")
+        self.val_fdmh.pack(anchor="w", padx=10, pady=(0, 5))
+
+        self.card_wym = ctk.CTkFrame(self.results_container, fg_color="#2b2b2b", corner_radius=10, border_width=1,
+                                     border_color="#00e5ff")
+        self.card_wym.pack(fill="x", pady=5)
+        frame_wym = ctk.CTkFrame(self.card_wym, fg_color="transparent")
+        frame_wym.pack(fill="x", padx=10, pady=(5, 0))
+        ctk.CTkLabel(frame_wym, text="Wymiarowanie (Erlang B)", font=("Arial", 12, "bold"),
+                     text_color="#aaaaaa").pack(side="left")
+        self.combo_gos = ctk.CTkOptionMenu(frame_wym, values=list(self.GOS), width=70,
+                                           command=lambda _: self.aktualizuj_wyniki())
+        self.combo_gos.set("1%")
+        self.combo_gos.pack(side="right")
+        self.val_wym = ctk.CTkLabel(self.card_wym, text="-- łączy", font=("Arial", 20, "bold"), text_color="#00e5ff")
+        self.val_wym.pack(anchor="w", padx=10, pady=(0, 0))
+        self.gorne_wym = ctk.CTkLabel(self.card_wym, text="Górna granica: -- łączy", font=("Arial", 12),
+                                      text_color="#aaaaaa")
+        self.gorne_wym.pack(anchor="w", padx=10, pady=(0, 5))
+
+        self.lbl_info = ctk.CTkLabel(self.left_frame, text="Brak danych.", font=("Arial", 11), text_color="gray")
+        self.lbl_info.grid(row=10, column=0, pady=5)
+
+        # Diagnostyka: czasy etapów ostatnich operacji (pomiary włączone tylko przy rozwiniętym panelu)
+        self.btn_diag = ctk.CTkButton(self.left_frame, text="▸ Diagnostyka", command=self.akcja_diagnostyka,
+                                      fg_color="transparent", hover_color="#333333", text_color="#aaaaaa",
+                                      anchor="w")
+        self.btn_diag.grid(row=11, column=0, padx=20, pady=(5, 0), sticky="ew")
+        self.frame_diag = ctk.CTkFrame(self.left_frame, fg_color="transparent")
+        self.frame_diag.grid(row=12, column=0, padx=20, pady=0, sticky="ew")
+        self.txt_diag = ctk.CTkTextbox(self.frame_diag, height=160, font=("Courier New", 11), wrap="none")
+        self.txt_diag.pack(fill="x")
+        self.txt_diag.configure(state="disabled")
+        self.btn_profiluj = ctk.CTkButton(self.frame_diag, text="Profiluj następne przeliczenie",
+                                          command=self.akcja_profiluj, fg_color="#555555", hover_color="#333333")
+        self.btn_profiluj.pack(fill="x", pady=(5, 0))
+        self.frame_diag.grid_remove()
+
+        # Postęp operacji w tle (widoczny tylko w trakcie pracy)
+        self.frame_postep = ctk.CTkFrame(self.left_frame, fg_color="transparent")
+        self.frame_postep.grid(row=13, column=0, padx=20, pady=0, sticky="ew")
+        self.lbl_postep = ctk.CTkLabel(self.frame_postep, text="", font=("Arial", 11), text_color="#aaaaaa")
+        self.lbl_postep.pack(anchor="w")
+        self.pasek_postepu = ctk.CTkProgressBar(self.frame_postep)
+        self.pasek_postepu.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        self.btn_anuluj = ctk.CTkButton(self.frame_postep, text="Anuluj", width=70, command=self.akcja_anuluj,
+                                        fg_color="#555555", hover_color="#333333")
+        self.btn_anuluj.pack(side="right")
+        self.frame_postep.grid_remove()
+
+        self.btn_clean = ctk.CTkButton(self.left_frame, text="WYCZYŚĆ DANE", command=self.akcja_clean,
+                                       fg_color="#c0392b", hover_color="#a93226")
+        self.btn_clean.grid(row=14, column=0, padx=20, pady=(10, 30), sticky="ew")
+
+        self.right_frame = ctk.CTkFrame(self, corner_radius=0, fg_color="#2b2b2b")
+        self.right_frame.grid(row=0, column=1, sticky="nswe")
+
+        plt.rcParams['font.family'] = 'sans-serif'
+        plt.rcParams['font.sans-serif'] = ['Arial', 'Segoe UI', 'DejaVu Sans']
+
+        self.fig = plt.Figure(figsize=(8, 8), dpi=100)
+        self.fig.patch.set_facecolor('#2b2b2b')
+        self.ax = self.fig.add_subplot(111)
+        self.ax.set_facecolor('#212121')
+        self.ax.spines['top'].set_visible(False)
+        self.ax.spines['right'].set_visible(False)
+        self.ax.spines['bottom'].set_color('#555555')
+        self.ax.spines['left'].set_color('#555555')
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.right_frame)
+        self.canvas.get_tk_widget().pack(side="top", fill="both", expand=True, padx=20, pady=20)
+
+        toolbar = NavigationToolbar2Tk(self.canvas, self.right_frame)
+        toolbar.config(background='#2b2b2b')
+        toolbar._message_label.config(background='#2b2b2b', foreground='white')
+        for button in toolbar.winfo_children():
+            button.config(background='#2b2b2b')
+        toolbar.update()
+
+        self.wykres = WykresProfilu(self.fig, self.ax)
+        self.reset_wykresu()
+        self.after(100, self._odbierz_zadania)
+
+    def _odbierz_zadania(self):
+        for zadanie in self.robotnik.odbierz():
+            zadanie.po_zakonczeniu(zadanie)
+
+        biezace = self.robotnik.postep()
+        if biezace is None:
+            self.frame_postep.grid_remove()
+        else:
+            self.frame_postep.grid()
+            if biezace.postep:
+                zrobione, wszystkie, opis = biezace.postep
+                self.pasek_postepu.set(zrobione / wszystkie if wszystkie else 0)
+                self.lbl_postep.configure(text=f"{opis}: {zrobione}/{wszystkie}")
+            else:
+                self.pasek_postepu.set(0)
+                self.lbl_postep.configure(text="Przetwarzanie...")
+        self.after(100, self._odbierz_zadania)
+
+    def otworz_pdf(self):
+        plik = resource_path("dokumentacja.pdf")
+        if not os.path.exists(plik):
+            messagebox.showerror("Błąd", f"Nie znaleziono pliku dokumentacji!\nSzukano: {plik}")
+            return
+        try:
+            # macOS Support
+            if sys.platform == 'win32':
+                os.startfile(plik)
+            elif sys.platform == 'darwin':
+                subprocess.call(('open', plik))
+            else:
+                subprocess.call(('xdg-open', plik))
+        except Exception as e:
+            messagebox.showerror("Błąd", f"Nie udało się otworzyć pliku: {e}")
+
+    def otworz_pomoc(self):
+        help_window = ctk.CTkToplevel(self)
+        help_window.title("Instrukcja Obsługi")
+        help_window.geometry("600x600")
+        help_window.attributes("-topmost", True)
+        ctk.CTkLabel(help_window, text="Instrukcja Obsługi", font=ctk.CTkFont(size=20, weight="bold")).pack(pady=20)
+        txt = ctk.CTkTextbox(help_window, width=550, height=500, font=ctk.CTkFont(size=14))
+        txt.pack(padx=20, pady=10)
+        content = """1. Wybierz folder z plikami CSV.
+2. Program automatycznie wykryje format i separator.
+3. Wykres po prawej pokaże profil ruchu.
+4. Karty po lewej pokażą obliczone TCBH, ADPH i FDMH.
+5. Możesz zawęzić analizę do konkretnych godzin (OD-DO)."""
+        txt.insert("0.0", content)
+        txt.configure(state="disabled")
+
+    def reset_wykresu(self):
+        self.wykres.komunikat("Gotowy do pracy.\nWgraj dane.")
+        self.val_tcbh.configure(text="--.-- Erl")
+        self.time_tcbh.configure(text="Czas: --:-- - --:--")
+        self.val_conf.configure(text="+/- --.-- Erl")
+        self.val_adph.configure(text="--.-- Erl")
+        self.val_fdmh.configure(text="--.-- Erl")
+        self.val_wym.configure(text="-- łączy")
+        self.gorne_wym.configure(text="Górna granica: -- łączy")
+        self.lbl_info.configure(text="Brak danych.")
+
+    def rysuj_wykres_glowny(self, start_h, end_h):
+        # Pełna przebudowa tylko po zmianie danych - TCBH i linie OD/DO są przesuwane w miejscu
+        self.wykres.rysuj(self.engine.magazyn, self.engine.tcbh_start_index, start_h, end_h, self.engine.piramida())
+
+    def aktualizuj_wyniki(self):
+        try:
+            s = float(self.combo_start.get())
+            e = float(self.combo_end.get())
+        except ValueError:
+            s, e = 0, 24
+        gos = self.GOS[self.combo_gos.get()]
+        engine = self.engine
+        profil = self._profiluj_nastepne
+        self._profiluj_nastepne = False
+
+        def analiza(z):
+            if not profil: return engine.wymiaruj(start_h=s, end_h=e, gos=gos)
+            wynik, z.profil = profiluj(engine.wymiaruj, start_h=s, end_h=e, gos=gos)
+            return wynik
+
+        zadanie = Zadanie("analiza", analiza, lambda z: self._pokaz_wyniki(z, engine, s, e))
+        self.robotnik.zlec(zadanie, wypiera=("analiza",))
+
+    def _pokaz_wyniki(self, zadanie, engine, s, e):
+        if engine is not self.engine: return
+        if zadanie.blad:
+            return messagebox.showerror("Błąd", f"Błąd obliczeń: {zadanie.blad}")
+        dane = zadanie.wynik
+        if dane:
+            self.val_tcbh.configure(text=f"{dane['tcbh_val']:.2f} Erl")
+            self.time_tcbh.configure(text=f"Czas: {dane['tcbh_time']}")
+            err = dane['error_margin']
+            err_percent = (err / dane['tcbh_val']) * 100 if dane['tcbh_val'] > 0 else 0
+            col = "#2fa34e" if err_percent < 5 else "#f1c40f" if err_percent < 15 else "#c0392b"
+            self.val_conf.configure(text=f"+/- {err:.2f} Erl ({err_percent:.1f}%)", text_color=col)
+            self.card_conf.configure(border_color=col)
+            self.val_adph.configure(text=f"{dane['adph_val']:.2f} Erl")
+            self.val_fdmh.configure(text=f"{dane['fdmh_val']:.2f} Erl")
+            wym = dane['wymiarowanie']
+            self.val_wym.configure(text=f"{wym['laczy']} łączy (B = {wym['blokada'] * 100:.2f}%)")
+            self.gorne_wym.configure(text=f"Górna granica ({wym['obciazenie_gorne']:.2f} Erl): {wym['laczy_gorne']} łączy")
+            self.lbl_info.configure(text=f"Przeanalizowano {dane['dni']} dni. Zakres: {int(s)}:00 - {int(e)}:00")
+            self.rysuj_wykres_glowny(s, e)
+        if self._diagnostyka: self._pokaz_diagnostyke(zadanie.profil)
+
+    def _pokaz_diagnostyke(self, profil=None):
+        linie = []
+        for raport in list(self.engine.pomiary.raporty.values()) + [self.wykres.pomiary.raport("wykres")]:
+            if raport is not None: linie += formatuj_raport(raport)
+        if profil: linie += ["", profil]
+        self.txt_diag.configure(state="normal")
+        self.txt_diag.delete("0.0", "end")
+        self.txt_diag.insert("0.0", "\n".join(linie) or "Brak pomiarów - wczytaj dane lub przelicz.")
+        self.txt_diag.configure(state="disabled")
+
+    def _nowy_silnik(self):
+        engine = TrafficEngine()
+        if self._diagnostyka: engine.wlacz_pomiary()
+        return engine
+
+    def akcja_diagnostyka(self):
+        self._diagnostyka = not self._diagnostyka
+        if self._diagnostyka:
+            self.engine.wlacz_pomiary()
+            self.wykres.pomiary = Pomiary()
+            self.btn_diag.configure(text="▾ Diagnostyka")
+            self.frame_diag.grid()
+            self._pokaz_diagnostyke()
+        else:
+            self.engine.wylacz_pomiary()
+            self.wykres.pomiary = BEZ_POMIAROW
+            self.btn_diag.configure(text="▸ Diagnostyka")
+            self.frame_diag.grid_remove()
+
+    def akcja_profiluj(self):
+        # cProfile tylko na żądanie - narzut dotyczy jednego przeliczenia
+        self._profiluj_nastepne = True
+        self.aktualizuj_wyniki()
+
+    def _wczytaj_w_tle(self, funkcja):
+        """ Dane są wczytywane do nowego silnika - aktualny zostaje nietknięty do chwili sukcesu """
+        nowy = self._nowy_silnik()
+        zadanie = Zadanie("wczytanie", lambda z: funkcja(nowy, z), lambda z: self._po_wczytaniu(z, nowy))
+        self.robotnik.zlec(zadanie, wypiera=("wczytanie", "analiza"))
+
+    def _po_wczytaniu(self, zadanie, nowy):
+        if zadanie.blad:
+            return messagebox.showerror("Błąd", str(zadanie.blad))
+        ok, msg = zadanie.wynik
+        if ok:
+            self.engine = nowy
+            self.aktualizuj_wyniki()
+        else:
+            messagebox.showerror("Błąd", msg)
+
+    def akcja_tryb_auto(self):
+        path_czas = resource_path("czas_obslugi.txt")
+        path_int = resource_path("intensywnosc_wywolan.txt")
+        if not os.path.exists(path_czas):
+            return messagebox.showerror("Błąd", f"Nie znaleziono pliku: {path_czas}")
+        self._wczytaj_w_tle(lambda engine, z: engine.wczytaj_baze_i_symuluj(path_czas, path_int, postep=z.zglos,
+                                                                             anuluj=z.anuluj))
+
+    def akcja_tryb_folder(self):
+        folder = filedialog.askdirectory(title="Wybierz folder z danymi")
+        if not folder: return
+        szerokosc = self.BINY[self.combo_bin.get()]
+        self._wczytaj_w_tle(lambda engine, z: engine.wczytaj_folder_csv(folder, szerokosc_s=szerokosc, postep=z.zglos,
+                                                                         anuluj=z.anuluj))
+
+    def akcja_anuluj(self):
+        self.robotnik.anuluj_wszystkie()
+
+    def akcja_clean(self):
+        # Nowy silnik zamiast czyszczenia - zadanie w tle może jeszcze czytać stary
+        self.robotnik.anuluj_wszystkie()
+        self.engine = self._nowy_silnik()
+        self.reset_wykresu()
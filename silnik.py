@@ -0,0 +1,1967 @@
+import numpy as np
+import os
+import sys
+import re
+import datetime
+import json
+import hashlib
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial, wraps
+
+# pandas i scipy są importowane dopiero w funkcjach, które ich potrzebują -
+# tryb wsadowy z gotowego cache startuje wtedy bez ich kosztu.
+
+
+def resource_path(relative_path):
+    """ Pobiera absolutną ścieżkę do zasobu wewnątrz paczki .app """
+    try:
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+
+class Anulowano(Exception):
+    """ Operacja przerwana na żądanie użytkownika """
+
+
+def zglos_postep(postep, anuluj, zrobione, wszystkie, opis):
+    """ Przekazuje postęp (jeśli podano callback) i przerywa pracę, gdy ustawiono zdarzenie anuluj """
+    if anuluj is not None and anuluj.is_set(): raise Anulowano()
+    if postep is not None: postep(zrobione, wszystkie, opis)
+
+
+# =============================================================================
+# POMIARY CZASU ETAPÓW (DIAGNOSTYKA)
+# =============================================================================
+def _pamiec_procesu():
+    """ Pamięć rezydentna procesu [B] (psutil, a bez niego /proc/self/statm); None gdy niedostępna """
+    global _pamiec_procesu
+    try:
+        import psutil
+        proces = psutil.Process()
+        _pamiec_procesu = lambda: proces.memory_info().rss
+    except ImportError:
+        if os.path.exists('/proc/self/statm'):
+            strona = os.sysconf('SC_PAGE_SIZE')
+
+            def _pamiec_procesu():
+                with open('/proc/self/statm') as f:
+                    return int(f.read().split()[1]) * strona
+        else:
+            _pamiec_procesu = lambda: None
+    return _pamiec_procesu()
+
+
+class _Etap:
+    __slots__ = ("pomiary", "wpis", "t0", "pamiec0")
+
+    def __init__(self, pomiary, nazwa, liczniki):
+        self.pomiary = pomiary
+        self.wpis = {"etap": nazwa, "poziom": 0, **liczniki}
+
+    def ustaw(self, **liczniki):
+        """ Liczniki znane dopiero w trakcie etapu (pliki, wiersze, dni) """
+        self.wpis.update(liczniki)
+
+    def __enter__(self):
+        # Wpis trafia na listę przy wejściu - etapy zagnieżdżone stoją po swoim rodzicu
+        self.wpis["poziom"] = self.pomiary._poziom
+        self.pomiary.etapy.append(self.wpis)
+        self.pomiary._poziom += 1
+        self.pamiec0 = _pamiec_procesu() if self.pomiary.pamiec else None
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *wyjatek):
+        self.wpis["czas_s"] = time.perf_counter() - self.t0
+        if self.pamiec0 is not None:
+            self.wpis["pamiec_mb"] = (_pamiec_procesu() - self.pamiec0) / 2 ** 20
+        self.pomiary._poziom -= 1
+        return False
+
+
+class _PustyEtap:
+    """ Etap przy wyłączonych pomiarach - jedno wywołanie bez alokacji """
+    __slots__ = ()
+
+    def ustaw(self, **liczniki):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *wyjatek):
+        return False
+
+
+_PUSTY_ETAP = _PustyEtap()
+
+
+class Pomiary:
+    """ Czasy etapów operacji (czas ścienny, zmiana pamięci, liczniki) z opcjonalnym logiem JSON (linia na operację) """
+
+    def __init__(self, log=None, pamiec=True):
+        self.log = log
+        self.pamiec = pamiec
+        self.etapy = []
+        self.raporty = {}
+        self._poziom = 0
+        self._blokada = threading.Lock()
+
+    def __bool__(self):
+        return True
+
+    def etap(self, nazwa, **liczniki):
+        return _Etap(self, nazwa, liczniki)
+
+    def operacja(self, nazwa, **liczniki):
+        """ Etap najwyższego poziomu: zaczyna nowy raport i po zakończeniu zapisuje go pod nazwą operacji """
+        return _Operacja(self, nazwa, liczniki)
+
+    def raport(self, operacja):
+        return self.raporty.get(operacja)
+
+    def _zakoncz(self, operacja):
+        raport = {"operacja": operacja, "czas_s": self.etapy[0].get("czas_s", 0.0), "etapy": self.etapy}
+        self.raporty[operacja] = raport
+        self.etapy = []
+        if self.log:
+            wpis = {"znacznik": datetime.datetime.now().isoformat(timespec='seconds'), **raport}
+            with self._blokada, open(self.log, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(wpis, ensure_ascii=False, default=float) + "\n")
+        return raport
+
+
+class _Operacja(_Etap):
+    __slots__ = ("glowna",)
+
+    def __enter__(self):
+        # Operacja wywołana wewnątrz innej (np. oblicz_gnr z wymiaruj) jest zwykłym etapem zewnętrznej
+        self.glowna = self.pomiary._poziom == 0
+        if self.glowna: self.pomiary.etapy = []
+        return super().__enter__()
+
+    def __exit__(self, *wyjatek):
+        super().__exit__(*wyjatek)
+        if self.glowna: self.pomiary._zakoncz(self.wpis["etap"])
+        return False
+
+
+def mierzona(nazwa):
+    """ Metoda silnika jako operacja pomiarów (self.pomiary); przy wyłączonych pomiarach - pusty blok with """
+    def dekorator(metoda):
+        @wraps(metoda)
+        def opakowana(self, *args, **kwargs):
+            with self.pomiary.operacja(nazwa):
+                return metoda(self, *args, **kwargs)
+        return opakowana
+    return dekorator
+
+
+class _BezPomiarow:
+    """ Pomiary wyłączone: etapy są pustymi blokami with, raportów brak """
+
+    def __bool__(self):
+        return False
+
+    def etap(self, nazwa, **liczniki):
+        return _PUSTY_ETAP
+
+    operacja = etap
+
+    def raport(self, operacja):
+        return None
+
+
+BEZ_POMIAROW = _BezPomiarow()
+
+
+def profiluj(funkcja, *args, plik=None, limit=25, **kwargs):
+    """ Jednorazowy przebieg funkcji pod cProfile: zwraca (wynik, tekst statystyk); plik - zapis .prof """
+    import cProfile
+    import io
+    import pstats
+    profiler = cProfile.Profile()
+    wynik = profiler.runcall(funkcja, *args, **kwargs)
+    if plik: profiler.dump_stats(plik)
+    tekst = io.StringIO()
+    pstats.Stats(profiler, stream=tekst).sort_stats('cumulative').print_stats(limit)
+    return wynik, tekst.getvalue()
+
+
+def formatuj_raport(raport):
+    """ Raport czasów jako wiersze tekstu (wcięcie = zagnieżdżenie etapu) """
+    wiersze = []
+    for wpis in raport["etapy"]:
+        liczniki = ", ".join(f"{k}={v}" for k, v in wpis.items()
+                             if k not in ("etap", "poziom", "czas_s", "pamiec_mb"))
+        tekst = f"{'  ' * wpis['poziom']}{wpis['etap']}: {wpis.get('czas_s', 0) * 1000:.1f} ms"
+        if "pamiec_mb" in wpis: tekst += f", {wpis['pamiec_mb']:+.1f} MB"
+        if liczniki: tekst += f" ({liczniki})"
+        wiersze.append(tekst)
+    return wiersze
+
+
+# =============================================================================
+# MAGAZYN DANYCH
+# =============================================================================
+MINUT_NA_DOBE = 1440
+SEKUND_NA_DOBE = 86400
+
+_WZORZEC_DATY = re.compile(r'(\d{4})[-_.]?(\d{2})[-_.]?(\d{2})')
+
+
+def data_z_nazwy(nazwa_pliku):
+    """ Wyciąga datę dnia pomiarowego z nazwy pliku (np. ruch_2024-03-01.csv) """
+    m = _WZORZEC_DATY.search(os.path.basename(nazwa_pliku))
+    if not m: return None
+    try:
+        return datetime.date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+    except ValueError:
+        return None
+
+
+class MagazynDni:
+    """ Ciągła macierz (dni x 1440) z metadanymi dni, wypełniana w miejscu i rozszerzana wg potrzeb
+
+    Przy szerokosc_s innej niż 60 wiersz ma binow_na_dobe(szerokosc_s) kolumn (np. 8640 dla 10 s).
+    """
+
+    def __init__(self, dtype=np.float64, pojemnosc=32, szerokosc_s=60):
+        self.dtype = np.dtype(dtype)
+        self.szerokosc_s = szerokosc_s
+        self.biny = binow_na_dobe(szerokosc_s)
+        self._dane = np.zeros((pojemnosc, self.biny), dtype=self.dtype)
+        self.liczba_dni = 0
+        self.zrodla = []
+        self.daty = []
+        self.wersja = 0
+
+    def __len__(self):
+        return self.liczba_dni
+
+    @property
+    def macierz(self):
+        # Widok na wypełnioną część bufora - bez kopiowania
+        return self._dane[:self.liczba_dni]
+
+    def wyczysc(self):
+        if not self._dane.flags.writeable:
+            self._dane = np.zeros((32, self.biny), dtype=self.dtype)
+        self.liczba_dni = 0
+        self.zrodla = []
+        self.daty = []
+        self.wersja += 1
+
+    def przejmij(self, macierz, zrodla, daty):
+        """ Używa gotowej macierzy (np. zmapowanej z dysku) bez kopiowania; kopia powstaje dopiero przy dopisaniu """
+        if macierz.dtype != self.dtype: macierz = macierz.astype(self.dtype)
+        self._dane = macierz
+        self.liczba_dni = len(macierz)
+        self.zrodla = list(zrodla)
+        self.daty = list(daty)
+        self.wersja += 1
+
+    def rezerwuj(self, ile_dni):
+        potrzebne = self.liczba_dni + ile_dni
+        if potrzebne <= len(self._dane) and self._dane.flags.writeable: return
+        nowa_pojemnosc = max(potrzebne, 2 * len(self._dane))
+        nowe = np.zeros((nowa_pojemnosc, self.biny), dtype=self.dtype)
+        nowe[:self.liczba_dni] = self._dane[:self.liczba_dni]
+        self._dane = nowe
+
+    def nowy_dzien(self, zrodlo=None, data=None):
+        """ Rezerwuje wiersz na kolejny dzień i zwraca go jako widok do wypełnienia w miejscu """
+        self.rezerwuj(1)
+        wiersz = self._dane[self.liczba_dni]
+        wiersz[:] = 0
+        self.liczba_dni += 1
+        self.zrodla.append(zrodlo)
+        self.daty.append(data)
+        self.wersja += 1
+        return wiersz
+
+    def dodaj_dzien(self, ruch_erl, zrodlo=None, data=None):
+        wiersz = self.nowy_dzien(zrodlo, data)
+        n = min(len(ruch_erl), self.biny)
+        wiersz[:n] = ruch_erl[:n]
+        return wiersz
+
+    def nowe_dni(self, ile_dni, zrodlo=None):
+        """ Rezerwuje ile_dni kolejnych wierszy i zwraca je jako jeden widok do wypełnienia """
+        self.rezerwuj(ile_dni)
+        blok = self._dane[self.liczba_dni:self.liczba_dni + ile_dni]
+        self.liczba_dni += ile_dni
+        self.zrodla.extend([zrodlo] * ile_dni)
+        self.daty.extend([None] * ile_dni)
+        self.wersja += 1
+        return blok
+
+    def dodaj_dni(self, macierz, zrodla=None, daty=None):
+        ile = len(macierz)
+        self.rezerwuj(ile)
+        self._dane[self.liczba_dni:self.liczba_dni + ile] = macierz
+        self.liczba_dni += ile
+        self.zrodla.extend(zrodla if zrodla is not None else [None] * ile)
+        self.daty.extend(daty if daty is not None else [None] * ile)
+        self.wersja += 1
+
+
+# =============================================================================
+# PIRAMIDA ROZDZIELCZOŚCI
+# =============================================================================
+POZIOMY_PIRAMIDY = (10, 60, 900, 3600)
+
+
+def binow_na_dobe(szerokosc_s):
+    """ Liczba binów doby dla szerokości binu [s]; bin musi dzielić minutę albo być wielokrotnością minuty """
+    if szerokosc_s <= 0 or SEKUND_NA_DOBE % szerokosc_s or (60 % szerokosc_s and szerokosc_s % 60):
+        raise ValueError(f"Nieobsługiwana szerokość binu: {szerokosc_s} s")
+    return SEKUND_NA_DOBE // szerokosc_s
+
+
+def zmien_rozdzielczosc(macierz, z_szerokosci, na_szerokosc):
+    """ Biny dni (ostatnia oś) w innej szerokości: średnia przy łączeniu, powtórzenie wartości przy podziale
+
+    Ruch w Erlangach jest średnią zajętością, więc średnia z binów drobnych jest dokładnym binem grubszym.
+    Podział zakłada stały ruch w obrębie binu źródła (suma ruchu się nie zmienia).
+    """
+    if na_szerokosc == z_szerokosci: return macierz
+    if na_szerokosc > z_szerokosci:
+        k = na_szerokosc // z_szerokosci
+        return macierz.reshape(macierz.shape[:-1] + (macierz.shape[-1] // k, k)).mean(axis=-1)
+    return np.repeat(macierz, z_szerokosci // na_szerokosc, axis=-1)
+
+
+def poziom_analizy(szerokosc_zrodla, start_h=0, end_h=24):
+    """ Najgrubszy poziom [s] dokładny dla okna godzinnego przesuwanego co minutę w zakresie OD-DO
+
+    Dane o binach drobniejszych niż minuta są analizowane na poziomie minutowym; dane grubsze (np. 15 min)
+    na własnym poziomie, o ile OD i DO wypadają na granicach binu - suma okna jest wtedy liniowa między
+    granicami binów, więc maksimum (TCBH, ADPH) leży na granicy i wynik jest taki sam jak z minut.
+    Okno godzinne musi składać się z całych binów (bin dzieli godzinę), inaczej zostają minuty.
+    """
+    granice = (round(start_h * 3600), round(min(end_h, 24) * 3600))
+    if szerokosc_zrodla <= 60 or 3600 % szerokosc_zrodla or any(g % szerokosc_zrodla for g in granice): return 60
+    return szerokosc_zrodla
+
+
+class Piramida:
+    """ Poziomy rozdzielczości tych samych dni (10 s -> 1 min -> 15 min -> 1 h), budowane raz na wczytanie
+
+    Poziom minutowy to macierz magazynu (bez kopii), drobny - magazyn danych źródłowych (bez kopii).
+    Poziomy drobniejsze od danych źródłowych nie powstają (poza minutowym, wspólnym dla całego silnika).
+    """
+
+    def __init__(self, minutowa, szerokosc_zrodla=60, drobna=None):
+        self.szerokosc_zrodla = szerokosc_zrodla
+        self.poziomy = {60: minutowa}
+        if drobna is not None: self.poziomy[szerokosc_zrodla] = drobna
+        if szerokosc_zrodla > 60:
+            # Minuty grubszych danych to powtórzone biny źródła - co k-ta kolumna odtwarza je dokładnie
+            self.poziomy[szerokosc_zrodla] = np.ascontiguousarray(minutowa[:, ::szerokosc_zrodla // 60])
+        for szerokosc in POZIOMY_PIRAMIDY:
+            if szerokosc in self.poziomy or szerokosc < szerokosc_zrodla or szerokosc % szerokosc_zrodla: continue
+            # Każdy poziom z najbliższego drobniejszego, który go dzieli (średnia z mniejszej liczby kolumn)
+            baza = max(w for w in self.poziomy if w >= szerokosc_zrodla and w < szerokosc and szerokosc % w == 0)
+            self.poziomy[szerokosc] = zmien_rozdzielczosc(self.poziomy[baza], baza, szerokosc)
+
+    @property
+    def szerokosci(self):
+        return sorted(self.poziomy)
+
+    def poziom(self, szerokosc_s):
+        return self.poziomy[szerokosc_s]
+
+    def do_analizy(self, start_h=0, end_h=24):
+        return poziom_analizy(self.szerokosc_zrodla, start_h, end_h)
+
+    def do_wykresu(self, zakres_min, szerokosc_px):
+        """ Najgrubszy poziom z co najmniej jednym binem na piksel widocznego zakresu (albo najdrobniejszy) """
+        szerokosci = [w for w in self.szerokosci if w >= self.szerokosc_zrodla]
+        for szerokosc in reversed(szerokosci):
+            if zakres_min * 60 / szerokosc >= szerokosc_px: return szerokosc
+        return szerokosci[0]
+
+
+# =============================================================================
+# INDEKS ANALIZY (SUMY SKUMULOWANE)
+# =============================================================================
+OKNO_GODZINY = 60
+PACZKA_DNI = 4096
+
+
+def zakres_minut(start_h, end_h, okno=OKNO_GODZINY):
+    """ Zakres OD-DO w binach; okno to liczba binów na godzinę (60 dla minut) """
+    idx_start = max(0, int(start_h * okno))
+    idx_end = min(24 * okno, int(end_h * okno))
+    if idx_start >= idx_end: idx_start, idx_end = 0, 24 * okno
+    return idx_start, idx_end
+
+
+def kwantyl_t(stopnie_swobody, ufnosc=0.95):
+    """ Kwantyl rozkładu t-Studenta dla dwustronnego przedziału ufności (jak stats.t.interval) """
+    from scipy.special import stdtrit  # Lekki import zamiast całego scipy.stats
+    return stdtrit(stopnie_swobody, (1 + ufnosc) / 2)
+
+
+def format_tcbh(tcbh_start):
+    h_s, m_s = divmod(tcbh_start, 60)
+    h_e, m_e = divmod(tcbh_start + OKNO_GODZINY, 60)
+    return f"{h_s:02d}:{m_s:02d} - {h_e:02d}:{m_e:02d}"
+
+
+def sumy_skumulowane(macierz, out=None):
+    """ Sumy skumulowane dni po minutach: kolumna t to suma ruchu z minut [0, t) """
+    if out is None: out = np.empty((len(macierz), macierz.shape[1] + 1))
+    out[:, 0] = 0
+    np.cumsum(macierz, axis=1, dtype=np.float64, out=out[:, 1:])
+    return out
+
+
+def maksima_godzinowe(skumulowane, idx_start, idx_end, okno=OKNO_GODZINY):
+    """ Maksimum godzinnej średniej ruchomej każdego dnia (okna zaczynające się w [idx_start, idx_end - 60]) """
+    maksima = np.empty(len(skumulowane))
+    for p in range(0, len(skumulowane), PACZKA_DNI):
+        blok = skumulowane[p:p + PACZKA_DNI]
+        sumy_okien = blok[:, idx_start + okno:idx_end + 1] - blok[:, idx_start:idx_end - okno + 1]
+        maksima[p:p + PACZKA_DNI] = sumy_okien.max(axis=1) / okno
+    return maksima
+
+
+def srednie_w_oknie(skumulowane, tcbh_start, okno=OKNO_GODZINY):
+    return (skumulowane[:, tcbh_start + okno] - skumulowane[:, tcbh_start]) / okno
+
+
+def srednie_okien(skumulowane):
+    """ Średnie dzienne we wszystkich oknach godzinnych (dni x 1381) """
+    return (skumulowane[:, OKNO_GODZINY:] - skumulowane[:, :-OKNO_GODZINY]) / OKNO_GODZINY
+
+
+def odchylenie(srednie_dnia_w_tcbh):
+    return np.std(srednie_dnia_w_tcbh, ddof=1) if len(srednie_dnia_w_tcbh) > 1 else np.nan
+
+
+def wynik_gnr(profil_skumulowany, liczba_dni, start_h, end_h, val_adph, std_dev, tcbh_start, okno=OKNO_GODZINY):
+    """ Składa wynik oblicz_gnr z sum zagregowanych po dniach (wspólne dla wszystkich ścieżek obliczeń)
+
+    tcbh_start jest w binach profilu (okno binów na godzinę); w wyniku - w minutach.
+    """
+    val_tcbh = (profil_skumulowany[tcbh_start + okno] - profil_skumulowany[tcbh_start]) / okno / liczba_dni
+    tcbh_start *= OKNO_GODZINY // okno
+
+    godziny_zakres = [g for g in range(int(start_h), int(end_h)) if g < 24]
+    if godziny_zakres:
+        granice = profil_skumulowany[::okno]
+        profil_godzinowy = (granice[1:] - granice[:-1]) / okno / liczba_dni
+        val_fdmh = np.max(profil_godzinowy[godziny_zakres])
+    else:
+        val_fdmh = 0.0
+
+    margines_bledu = 0.0
+    if liczba_dni > 1:
+        sem = std_dev / np.sqrt(liczba_dni)
+        margines_bledu = kwantyl_t(liczba_dni - 1) * sem
+
+    return {
+        "dni": liczba_dni,
+        "tcbh_val": val_tcbh,
+        "tcbh_time": format_tcbh(tcbh_start),
+        "tcbh_start": tcbh_start,
+        "adph_val": val_adph,
+        "fdmh_val": val_fdmh,
+        "error_margin": margines_bledu
+    }
+
+
+def start_tcbh(profil_skumulowany, idx_start, idx_end, okno=OKNO_GODZINY):
+    sumy_okien = profil_skumulowany[idx_start + okno:idx_end + 1] - profil_skumulowany[idx_start:idx_end - okno + 1]
+    return idx_start + int(np.argmax(sumy_okien))
+
+
+def _bloki_dni(macierze, rozmiar_paczki):
+    for macierz in macierze:
+        # Cache folderu trzyma dni w rozdzielczości źródła (np. 96 binów po 15 min) - paczki idą do minut
+        szerokosc = SEKUND_NA_DOBE // max(1, macierz.shape[1])
+        if binow_na_dobe(szerokosc) != macierz.shape[1]:
+            raise ValueError(f"Nieobsługiwana liczba binów doby: {macierz.shape[1]}")
+        for p in range(0, len(macierz), rozmiar_paczki):
+            yield zmien_rozdzielczosc(np.asarray(macierz[p:p + rozmiar_paczki]), szerokosc, 60)
+
+
+def oblicz_gnr_strumieniowo(macierze, start_h=0, end_h=24, rozmiar_paczki=PACZKA_DNI):
+    """ Wynik jak IndeksAnalizy.oblicz, ale paczkami dni (np. z np.load(..., mmap_mode='r')) w ograniczonej pamięci
+
+    macierze: macierz (dni x 1440) albo lista takich macierzy traktowanych jako kolejne dni; macierze o innej
+    liczbie binów doby (np. 8640 dla 10 s) są paczkami sprowadzane do minut.
+    Sumy po dniach są liczone w tej samej kolejności co w pamięci, więc wyniki są identyczne.
+    """
+    if not isinstance(macierze, (list, tuple)): macierze = [macierze]
+    liczba_dni = sum(len(m) for m in macierze)
+    if liczba_dni == 0: return None
+    idx_start, idx_end = zakres_minut(start_h, end_h)
+    if idx_end - idx_start < OKNO_GODZINY: return None
+
+    # Wiersz 0 bufora trzyma sumę dotychczasowych dni, kolejne - sumy skumulowane bieżącej paczki
+    bufor = np.zeros((rozmiar_paczki + 1, MINUT_NA_DOBE + 1))
+    maksima = np.empty(liczba_dni)
+    p = 0
+    for blok in _bloki_dni(macierze, rozmiar_paczki):
+        n = len(blok)
+        skumulowane = sumy_skumulowane(blok, out=bufor[1:n + 1])
+        maksima[p:p + n] = maksima_godzinowe(skumulowane, idx_start, idx_end)
+        bufor[0] = bufor[:n + 1].sum(axis=0)
+        p += n
+    profil_skumulowany = bufor[0].copy()
+
+    tcbh_start = start_tcbh(profil_skumulowany, idx_start, idx_end)
+    srednie = np.empty(liczba_dni)
+    p = 0
+    for blok in _bloki_dni(macierze, rozmiar_paczki):
+        n = len(blok)
+        srednie[p:p + n] = srednie_w_oknie(sumy_skumulowane(blok, out=bufor[1:n + 1]), tcbh_start)
+        p += n
+
+    return wynik_gnr(profil_skumulowany, liczba_dni, start_h, end_h, np.mean(maksima), odchylenie(srednie),
+                     tcbh_start)
+
+
+class IndeksAnalizy:
+    """ Indeks sum skumulowanych macierzy dni - budowany raz na wczytanie danych
+
+    szerokosc_s: szerokość binu macierzy (60 albo grubszy poziom piramidy, np. 900); start TCBH w wyniku
+    jest zawsze w minutach.
+    """
+    pomiary = BEZ_POMIAROW
+
+    def __init__(self, macierz, szerokosc_s=60):
+        self.okno = 3600 // szerokosc_s
+        self.liczba_dni = len(macierz)
+        self.skumulowane = sumy_skumulowane(macierz)
+        # Suma po dniach liczona wierszami po kolei (tak samo jak w trybie strumieniowym)
+        self.profil_skumulowany = self.skumulowane.sum(axis=0)
+        self._pamiec = {}
+
+    def oblicz(self, start_h=0, end_h=24):
+        klucz = (start_h, end_h)
+        if klucz not in self._pamiec:
+            self._pamiec[klucz] = self._oblicz(start_h, end_h)
+        return self._pamiec[klucz]
+
+    def _oblicz(self, start_h, end_h):
+        okno = self.okno
+        idx_start, idx_end = zakres_minut(start_h, end_h, okno)
+        if idx_end - idx_start < okno: return None
+
+        pomiary = self.pomiary
+        with pomiary.etap("okno TCBH (profil zagregowany)"):
+            tcbh_start = start_tcbh(self.profil_skumulowany, idx_start, idx_end, okno)
+        with pomiary.etap("maksima godzinowe dni (ADPH)", dni=self.liczba_dni):
+            maksima = maksima_godzinowe(self.skumulowane, idx_start, idx_end, okno)
+        with pomiary.etap("średnie dni w TCBH"):
+            srednie = srednie_w_oknie(self.skumulowane, tcbh_start, okno)
+        with pomiary.etap("FDMH i przedział t-Studenta"):
+            return wynik_gnr(self.profil_skumulowany, self.liczba_dni, start_h, end_h, np.mean(maksima),
+                             odchylenie(srednie), tcbh_start, okno)
+
+
+class IndeksPrzyrostowy(IndeksAnalizy):
+    """ Indeks dopisywany na bieżąco (nowe dni / minuty) bez przeliczania historii
+
+    Poza sumami skumulowanymi trzyma wariancję Welforda średnich dziennych dla każdego możliwego
+    okna godzinnego (więc przesunięcie TCBH nie wymaga powrotu do danych) i sumy maksimów dziennych
+    dla zakresów OD-DO, o które już pytano. Dzień w trakcie (dodaj_minuty) jest doliczany dopiero
+    przy zapytaniu, a po zamknięciu trafia do sum jak każdy inny dzień.
+    """
+
+    def __init__(self, macierz):
+        super().__init__(macierz)
+        n = self.liczba_dni
+        self._bufor = np.zeros((max(32, 2 * n), MINUT_NA_DOBE + 1))
+        self._bufor[:n] = self.skumulowane
+        self.skumulowane = self._bufor[:n]
+        self._srednia_okien = np.zeros(MINUT_NA_DOBE - OKNO_GODZINY + 1)
+        self._m2_okien = np.zeros(MINUT_NA_DOBE - OKNO_GODZINY + 1)
+        self._n_okien = 0
+        for p in range(0, n, PACZKA_DNI):
+            self._dolacz_okna(srednie_okien(self.skumulowane[p:p + PACZKA_DNI]))
+        self._sumy_maksimow = {}
+        self._otwarty = None
+
+    def _dolacz_okna(self, srednie):
+        """ Łączy statystyki Welforda z paczką dni (wzór Chana dla dwóch grup) """
+        n_b = len(srednie)
+        if n_b == 0: return
+        srednia_b = srednie.mean(axis=0)
+        m2_b = ((srednie - srednia_b) ** 2).sum(axis=0)
+        n = self._n_okien + n_b
+        delta = srednia_b - self._srednia_okien
+        self._srednia_okien += delta * n_b / n
+        self._m2_okien += m2_b + delta ** 2 * self._n_okien * n_b / n
+        self._n_okien = n
+
+    def dopisz_dzien(self, wiersz):
+        self._dopisz_skumulowany(sumy_skumulowane(wiersz[None, :])[0])
+
+    def _dopisz_skumulowany(self, skumulowany):
+        n = self.liczba_dni
+        if n == len(self._bufor):
+            nowy = np.zeros((2 * n, MINUT_NA_DOBE + 1))
+            nowy[:n] = self._bufor[:n]
+            self._bufor = nowy
+        self._bufor[n] = skumulowany
+        self.liczba_dni = n + 1
+        self.skumulowane = self._bufor[:n + 1]
+        self.profil_skumulowany += skumulowany
+        self._dolacz_okna(srednie_okien(skumulowany[None, :]))
+        for (idx_start, idx_end), suma in self._sumy_maksimow.items():
+            self._sumy_maksimow[(idx_start, idx_end)] = \
+                suma + maksima_godzinowe(skumulowany[None, :], idx_start, idx_end)[0]
+
+    def ustaw_otwarty(self, wiersz):
+        self._otwarty = sumy_skumulowane(wiersz[None, :])[0]
+
+    def zamknij_otwarty(self):
+        if self._otwarty is not None:
+            self._dopisz_skumulowany(self._otwarty)
+            self._otwarty = None
+
+    def oblicz(self, start_h=0, end_h=24):
+        idx_start, idx_end = zakres_minut(start_h, end_h)
+        otwarty = self._otwarty
+        liczba_dni = self.liczba_dni + (otwarty is not None)
+        if liczba_dni == 0 or idx_end - idx_start < OKNO_GODZINY: return None
+
+        profil = self.profil_skumulowany if otwarty is None else self.profil_skumulowany + otwarty
+        tcbh_start = start_tcbh(profil, idx_start, idx_end)
+
+        klucz = (idx_start, idx_end)
+        if klucz not in self._sumy_maksimow:
+            # Nowy zakres: jednorazowo po historii, dalej już przyrostowo
+            self._sumy_maksimow[klucz] = maksima_godzinowe(self.skumulowane, idx_start, idx_end).sum()
+        suma_maksimow = self._sumy_maksimow[klucz]
+
+        n, srednia, m2 = self._n_okien, self._srednia_okien[tcbh_start], self._m2_okien[tcbh_start]
+        if otwarty is not None:
+            suma_maksimow += maksima_godzinowe(otwarty[None, :], idx_start, idx_end)[0]
+            x = (otwarty[tcbh_start + OKNO_GODZINY] - otwarty[tcbh_start]) / OKNO_GODZINY
+            n += 1
+            delta = x - srednia
+            srednia += delta / n
+            m2 += delta * (x - srednia)
+        std_dev = np.sqrt(m2 / (n - 1)) if n > 1 else np.nan
+        return wynik_gnr(profil, liczba_dni, start_h, end_h, suma_maksimow / liczba_dni, std_dev, tcbh_start)
+
+
+# =============================================================================
+# BOOTSTRAP (PRZEDZIAŁY UFNOŚCI BEZ ZAŁOŻENIA NORMALNOŚCI)
+# =============================================================================
+PROBY_BOOTSTRAPU = 2000
+# Górna liczba elementów macierzy wag (próby x dni) i sum okien (próby x okna) w jednej paczce
+_ELEMENTY_PACZKI_BOOTSTRAPU = 1 << 22
+
+
+def przedzial_bootstrapu(wartosci, ufnosc=0.95):
+    """ Przedział percentylowy z rozkładu bootstrapowego """
+    dol, gora = np.percentile(wartosci, [(1 - ufnosc) / 2 * 100, (1 + ufnosc) / 2 * 100])
+    return {
+        "srednia": float(np.mean(wartosci)),
+        "std": float(np.std(wartosci, ddof=1)),
+        "dol": float(dol),
+        "gora": float(gora),
+    }
+
+
+def _paczka_bootstrapu(skumulowane, maksima, idx_start, idx_end, ile_prob, ziarno):
+    """ ile_prob losowań dni ze zwracaniem naraz: wagi (próby x dni) razy sumy okien dni (dni x okna) """
+    n = len(skumulowane)
+    rng = np.random.default_rng(ziarno)
+    # Wiersz wag = ile razy każdy dzień trafił do próby; profil próby to iloczyn wag i sum okien
+    losowania = rng.integers(0, n, size=(ile_prob, n))
+    losowania += (np.arange(ile_prob) * n)[:, None]
+    wagi = np.bincount(losowania.ravel(), minlength=ile_prob * n).reshape(ile_prob, n).astype(np.float64)
+    del losowania
+
+    sumy_okien = np.zeros((ile_prob, idx_end - idx_start - OKNO_GODZINY + 1))
+    for p in range(0, n, PACZKA_DNI):
+        blok = skumulowane[p:p + PACZKA_DNI]
+        okna = blok[:, idx_start + OKNO_GODZINY:idx_end + 1] - blok[:, idx_start:idx_end - OKNO_GODZINY + 1]
+        sumy_okien += wagi[:, p:p + PACZKA_DNI] @ okna
+    pozycje = np.argmax(sumy_okien, axis=1)
+    val_tcbh = sumy_okien[np.arange(ile_prob), pozycje] / OKNO_GODZINY / n
+    return idx_start + pozycje, val_tcbh, wagi @ maksima / n
+
+
+_baza_bootstrapu = None
+
+
+def _inicjuj_robotnika_bootstrapu(skumulowane, maksima, idx_start, idx_end):
+    global _baza_bootstrapu
+    _baza_bootstrapu = (skumulowane, maksima, idx_start, idx_end)
+
+
+def _paczka_bootstrapu_robotnika(ile_prob, ziarno):
+    return _paczka_bootstrapu(*_baza_bootstrapu, ile_prob, ziarno)
+
+
+def bootstrap_gnr(skumulowane, start_h=0, end_h=24, liczba_prob=PROBY_BOOTSTRAPU, ufnosc=0.95, seed=None,
+                  procesy=1):
+    """ Bootstrapowe przedziały ufności TCBH, ADPH i minuty startu TCBH (z sum skumulowanych dni)
+
+    Każda próba wyznacza TCBH od nowa, więc przedział obejmuje też niepewność położenia godziny szczytu.
+    Próby są liczone paczkami z osobnymi ziarnami - wynik dla danego seed nie zależy od liczby procesów.
+    """
+    n = len(skumulowane)
+    idx_start, idx_end = zakres_minut(start_h, end_h)
+    if n < 2 or idx_end - idx_start < OKNO_GODZINY: return None
+
+    rozmiar = max(1, min(liczba_prob, _ELEMENTY_PACZKI_BOOTSTRAPU // max(n, idx_end - idx_start - OKNO_GODZINY + 1)))
+    paczki = [min(rozmiar, liczba_prob - p) for p in range(0, liczba_prob, rozmiar)]
+    ziarna = np.random.SeedSequence(seed).spawn(len(paczki))
+    maksima = maksima_godzinowe(skumulowane, idx_start, idx_end)
+    baza = (skumulowane, maksima, idx_start, idx_end)
+    if procesy == 1 or len(paczki) == 1:
+        czesci = [_paczka_bootstrapu(*baza, ile, z) for ile, z in zip(paczki, ziarna)]
+    else:
+        with ProcessPoolExecutor(max_workers=procesy, initializer=_inicjuj_robotnika_bootstrapu,
+                                 initargs=baza) as pula:
+            czesci = list(pula.map(_paczka_bootstrapu_robotnika, paczki, ziarna))
+
+    tcbh_start, val_tcbh, val_adph = (np.concatenate(kolumna) for kolumna in zip(*czesci))
+    return {
+        "proby": liczba_prob,
+        "ufnosc": ufnosc,
+        "seed": seed,
+        "tcbh_val": przedzial_bootstrapu(val_tcbh, ufnosc),
+        "adph_val": przedzial_bootstrapu(val_adph, ufnosc),
+        "tcbh_start": przedzial_bootstrapu(tcbh_start, ufnosc),
+    }
+
+
+# =============================================================================
+# WCZYTYWANIE CSV
+# =============================================================================
+KOLUMNA_RUCHU = 'ruch_erl'
+_BAJTY_PROBKI = 4096
+_SEPARATORY = (';', ',', '\t')
+_WZORZEC_PRZECINKA_DZIESIETNEGO = re.compile(r'\d,\d')
+
+
+def wykryj_format_csv(sciezka, kolumna=KOLUMNA_RUCHU):
+    """ Rozpoznaje separator i znak dziesiętny z pierwszych bajtów pliku; None gdy brak podanej kolumny """
+    with open(sciezka, 'rb') as f:
+        probka = f.read(_BAJTY_PROBKI).decode('utf-8-sig', errors='replace')
+    naglowek, _, dane = probka.partition('\n')
+    for sep in _SEPARATORY:
+        kolumny = [k.strip('\r"\'') for k in naglowek.split(sep)]
+        if kolumna in kolumny:
+            decimal = ',' if sep != ',' and _WZORZEC_PRZECINKA_DZIESIETNEGO.search(dane) else '.'
+            return sep, decimal
+    return None
+
+
+def parsuj_plik_csv(sciezka):
+    """ Jednokrotny odczyt pliku dnia: zwraca (wektor ruch_erl, None) albo (None, powód pominięcia) """
+    import pandas as pd
+    try:
+        fmt = wykryj_format_csv(sciezka)
+        if fmt is None: return None, f"brak kolumny {KOLUMNA_RUCHU}"
+        sep, decimal = fmt
+        kolumna = pd.read_csv(sciezka, sep=sep, decimal=decimal, usecols=[KOLUMNA_RUCHU])[KOLUMNA_RUCHU]
+        if not pd.api.types.is_numeric_dtype(kolumna):
+            # Mieszany zapis liczb w jednym pliku - normalizacja tylko w tym (rzadkim) przypadku
+            kolumna = kolumna.astype(str).str.replace(',', '.')
+        ruch = pd.to_numeric(kolumna, errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+        if len(ruch) == 0: return None, "plik bez danych"
+        return ruch, None
+    except (OSError, ValueError) as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def parsuj_pliki_csv(sciezki, robotnicy=None, procesy=False):
+    """ Parsuje pliki równolegle (wątki albo procesy) i oddaje wyniki w kolejności ścieżek """
+    pula_typ = ProcessPoolExecutor if procesy else ThreadPoolExecutor
+    pula = pula_typ(max_workers=robotnicy)
+    try:
+        yield from pula.map(parsuj_plik_csv, sciezki, chunksize=16 if procesy else 1)
+    finally:
+        # Przy przerwaniu (anulowanie, błąd) nie czekamy na pliki jeszcze niezaczęte
+        pula.shutdown(cancel_futures=True)
+
+
+# =============================================================================
+# WCZYTYWANIE CDR (REKORDY POŁĄCZEŃ)
+# =============================================================================
+KOLUMNA_STARTU = 'start'
+KOLUMNA_CZASU = 'czas_trwania'
+PACZKA_CDR = 1_000_000
+_ROZSZERZENIA_JSONL = ('.jsonl', '.ndjson')
+# Strefa dopisana do godziny (Z, UTC, +01:00, +0200) - zdejmowana, zostaje czas zegara zapisany w rekordzie
+_STREFA_W_TEKSCIE = re.compile(r'(\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)\s*(?:Z|UTC|[+-]\d{2}(?::?\d{2})?)$')
+_ROZSZERZENIA_CDR = ('.csv',) + _ROZSZERZENIA_JSONL
+# Kolumny tablicy różnic za ostatnim dniem: wpisy "minuta końca (+1)" połączeń kończących się o północy
+# albo w ostatniej minucie doby - nie tworzą nowego dnia
+_ZAPAS_ROZNIC = 2
+
+
+def przesuniecia_strefy(sekundy_utc, strefa=None):
+    """ Przesunięcie czasu lokalnego względem UTC [s] dla epok; strefa None = strefa systemu, inaczej nazwa IANA
+
+    Liczone raz na kwadrans występujący w danych (zmiany czasu wypadają na pełnych kwadransach), nie na rekord.
+    """
+    strefa_tz = None
+    if strefa is not None:
+        from zoneinfo import ZoneInfo
+        strefa_tz = ZoneInfo(strefa)
+    kwadranse = np.floor(sekundy_utc / 900)
+    poprawne = np.isfinite(kwadranse)
+    unikalne, odwrotne = np.unique(kwadranse[poprawne], return_inverse=True)
+    try:
+        tablica = np.array([datetime.datetime.fromtimestamp(k * 900, strefa_tz).astimezone(strefa_tz)
+                            .utcoffset().total_seconds() for k in unikalne])
+    except (OverflowError, OSError) as e:
+        raise ValueError(f"epoka poza zakresem dat: {e}")
+    przesuniecia = np.full(len(sekundy_utc), np.nan)
+    przesuniecia[poprawne] = tablica[odwrotne] if len(tablica) else 0
+    return przesuniecia
+
+
+def sekundy_startu(kolumna, strefa=None):
+    """ Znaczniki czasu (epoka w sekundach albo tekst daty) -> sekundy od 1970-01-01 czasu lokalnego (NaN gdy błędne)
+
+    Epoki (UTC) są przeliczane na czas zegara w strefie (domyślnie systemowej), tak jak tekst daty bez strefy
+    jest czytany jako czas lokalny - doby i TCBH są liczone w czasie zegara centrali.
+    """
+    import pandas as pd
+    if pd.api.types.is_numeric_dtype(kolumna):
+        sekundy = kolumna.to_numpy(dtype=np.float64)
+        return sekundy + przesuniecia_strefy(sekundy, strefa)
+    try:
+        czas = pd.to_datetime(kolumna, errors='coerce', format='mixed')
+    except ValueError:
+        # Różne przesunięcia w jednym pliku (zmiana czasu) - strefa zdejmowana z każdego rekordu przed parsowaniem
+        tekst = kolumna.astype(str).str.strip().str.replace(_STREFA_W_TEKSCIE, r'\1', regex=True)
+        czas = pd.to_datetime(tekst, errors='coerce', format='mixed')
+    if getattr(czas.dt, 'tz', None) is not None:
+        # Strefa zapisana w rekordzie - liczy się lokalny czas zegara centrali
+        czas = czas.dt.tz_localize(None)
+    ns = czas.to_numpy(dtype='datetime64[ns]')
+    sekundy = ns.astype(np.int64) / 1e9
+    sekundy[np.isnat(ns)] = np.nan
+    return sekundy
+
+
+def czytaj_cdr(sciezka, kolumna_startu=KOLUMNA_STARTU, kolumna_czasu=KOLUMNA_CZASU, kolumna_encji=None,
+               rozmiar_paczki=PACZKA_CDR, strefa=None):
+    """ Czyta plik CDR (CSV albo JSONL) paczkami; oddaje (sekundy startu, czas trwania [s], id encji albo None) """
+    import pandas as pd
+    kolumny = [kolumna_startu, kolumna_czasu] + ([kolumna_encji] if kolumna_encji else [])
+    if sciezka.lower().endswith(_ROZSZERZENIA_JSONL):
+        paczki = pd.read_json(sciezka, lines=True, chunksize=rozmiar_paczki, dtype=False,
+                              convert_dates=False)
+    else:
+        fmt = wykryj_format_csv(sciezka, kolumna_startu)
+        if fmt is None: raise ValueError(f"brak kolumny {kolumna_startu}")
+        sep, decimal = fmt
+        paczki = pd.read_csv(sciezka, sep=sep, decimal=decimal, usecols=kolumny, chunksize=rozmiar_paczki)
+    with paczki:
+        for df in paczki:
+            brakujace = [k for k in kolumny if k not in df.columns]
+            if brakujace: raise ValueError(f"brak kolumny {brakujace[0]}")
+            czas = df[kolumna_czasu]
+            if not pd.api.types.is_numeric_dtype(czas):
+                czas = czas.astype(str).str.replace(',', '.')
+            czas = pd.to_numeric(czas, errors='coerce').to_numpy(dtype=np.float64)
+            encje = df[kolumna_encji].astype(str).to_numpy() if kolumna_encji else None
+            yield sekundy_startu(df[kolumna_startu], strefa), czas, encje
+
+
+class AkumulatorCDR:
+    """ Składa rekordy połączeń w minutowe profile ruchu [Erl] bez pętli po połączeniach
+
+    Zajętość jest sumowana w tablicy różnic po minutach bezwzględnych (od północy pierwszego dnia),
+    więc połączenia przez północ trafiają do obu dni. Pamięć zależy od liczby dni i encji, nie rekordów.
+    """
+
+    def __init__(self):
+        self._roznice = np.zeros((1, _ZAPAS_ROZNIC))
+        self._minuta0 = None
+        self._encje = {}
+        self.rekordy = 0
+        self.odrzucone = 0
+
+    def _rozszerz(self, min_minuta, max_minuta, liczba_encji):
+        """ Powiększa tablicę różnic do pełnych dni z minutami ruchu [min_minuta, max_minuta] i do liczby encji """
+        if self._minuta0 is None: self._minuta0 = min_minuta // MINUT_NA_DOBE * MINUT_NA_DOBE
+        encje, dlugosc = self._roznice.shape
+        dlugosc -= _ZAPAS_ROZNIC
+        przed = max(0, -(-(self._minuta0 - min_minuta) // MINUT_NA_DOBE)) * MINUT_NA_DOBE
+        # Długość w minutach liczona już od nowego początku (po dołożeniu dni "przed")
+        koniec = max(dlugosc + przed, -(-(max_minuta - self._minuta0 + przed + 1) // MINUT_NA_DOBE) * MINUT_NA_DOBE)
+        if przed or koniec > dlugosc or liczba_encji > encje:
+            nowe = np.zeros((max(encje, liczba_encji), koniec + _ZAPAS_ROZNIC))
+            # Razem z zapasem - jego wpisy należą do pierwszych minut dnia, który mógł właśnie dojść
+            nowe[:encje, przed:przed + dlugosc + _ZAPAS_ROZNIC] = self._roznice
+            self._roznice = nowe
+            self._minuta0 -= przed
+
+    def dodaj(self, sekundy_startu, czas_trwania, encje=None):
+        """ Dopisuje paczkę rekordów (wektory numpy tej samej długości) """
+        sekundy_startu = np.asarray(sekundy_startu, dtype=np.float64)
+        czas_trwania = np.asarray(czas_trwania, dtype=np.float64)
+        poprawne = np.isfinite(sekundy_startu) & np.isfinite(czas_trwania) & (czas_trwania > 0)
+        self.rekordy += len(poprawne)
+        self.odrzucone += int(len(poprawne) - np.count_nonzero(poprawne))
+        if not poprawne.all():
+            sekundy_startu, czas_trwania = sekundy_startu[poprawne], czas_trwania[poprawne]
+            if encje is not None: encje = np.asarray(encje)[poprawne]
+        if len(sekundy_startu) == 0: return
+
+        if encje is None:
+            indeksy_encji = 0
+            liczba_encji = 1
+        else:
+            import pandas as pd
+            kody, unikalne = pd.factorize(encje)
+            for encja in unikalne: self._encje.setdefault(encja, len(self._encje))
+            indeksy_encji = np.array([self._encje[e] for e in unikalne], dtype=np.int64)[kody]
+            liczba_encji = len(self._encje)
+
+        koniec = sekundy_startu + czas_trwania
+        minuta_startu = np.floor(sekundy_startu / 60).astype(np.int64)
+        minuta_konca = np.floor(koniec / 60).astype(np.int64)
+        # Ostatnia minuta z ruchem; wpisy minuty końca (+1) dalej trafiają do kolumn zapasu
+        self._rozszerz(int(minuta_startu.min()), int(np.ceil(koniec.max() / 60)) - 1, liczba_encji)
+
+        # Połączenie [a, b) daje minucie startu (60*(m+1) - a) s, kolejnym pełne 60 s i minucie końca (b - 60*m) s;
+        # po dwa wpisy na start i koniec, a cumsum odtwarza zajętość każdej minuty
+        reszta_startu = sekundy_startu - minuta_startu * 60
+        reszta_konca = koniec - minuta_konca * 60
+        minuta_startu -= self._minuta0
+        minuta_konca -= self._minuta0
+        przesuniecie = indeksy_encji * self._roznice.shape[1]
+        plaska = self._roznice.reshape(-1)
+        for minuty, wagi in ((minuta_startu, 60 - reszta_startu), (minuta_startu + 1, reszta_startu),
+                             (minuta_konca, reszta_konca - 60), (minuta_konca + 1, -reszta_konca)):
+            np.add.at(plaska, minuty + przesuniecie, wagi)
+
+    def dni(self):
+        """ Daty kolejnych wierszy wyniku (datetime.date) """
+        if self._minuta0 is None: return []
+        dzien0 = datetime.date(1970, 1, 1) + datetime.timedelta(days=self._minuta0 // MINUT_NA_DOBE)
+        return [dzien0 + datetime.timedelta(days=d)
+                for d in range((self._roznice.shape[1] - _ZAPAS_ROZNIC) // MINUT_NA_DOBE)]
+
+    def encje(self):
+        return list(self._encje)
+
+    def tensor(self):
+        """ Ruch [Erl] jako tensor (encje x dni x 1440); bez kolumny encji jest jedna encja """
+        zajetosc = np.cumsum(self._roznice[:, :-_ZAPAS_ROZNIC], axis=1) / 60
+        # Szum zaokrągleń float nie może dać ujemnego ruchu w minutach bez połączeń
+        np.maximum(zajetosc, 0, out=zajetosc)
+        return zajetosc.reshape(len(zajetosc), -1, MINUT_NA_DOBE)
+
+
+def pliki_cdr(zrodlo):
+    """ Plik albo folder (wszystkie .csv/.jsonl) albo lista takich ścieżek """
+    sciezki = zrodlo if isinstance(zrodlo, (list, tuple)) else [zrodlo]
+    pliki = []
+    for sciezka in sciezki:
+        if os.path.isdir(sciezka):
+            pliki += [os.path.join(sciezka, f) for f in sorted(os.listdir(sciezka))
+                      if f.lower().endswith(_ROZSZERZENIA_CDR)]
+        else:
+            pliki.append(sciezka)
+    return pliki
+
+
+# =============================================================================
+# CACHE WCZYTANYCH FOLDERÓW
+# =============================================================================
+KATALOG_CACHE = '.traffic_cache'
+WERSJA_CACHE = 1
+_PLIK_MACIERZY = 'dni.npy'
+_PLIK_MANIFESTU = 'manifest.json'
+
+
+def katalog_cache_folderu(sciezka_folderu, katalog_cache=None):
+    """ Cache obok danych (<folder>/.traffic_cache) albo we wspólnym katalogu, osobno dla każdego folderu """
+    if katalog_cache is None: return os.path.join(sciezka_folderu, KATALOG_CACHE)
+    klucz = hashlib.sha1(os.path.abspath(sciezka_folderu).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(katalog_cache, klucz)
+
+
+def wczytaj_cache(katalog, szerokosc_s=60):
+    """ Zwraca (macierz zmapowana z dysku, wpisy manifestu) albo None, gdy cache nie istnieje lub jest uszkodzony
+
+    Macierz ma rozdzielczość danych źródłowych; cache zapisany dla innej szerokości binu jest pomijany.
+    """
+    try:
+        with open(os.path.join(katalog, _PLIK_MANIFESTU), encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("wersja") != WERSJA_CACHE or manifest.get("szerokosc_s", 60) != szerokosc_s: return None
+        macierz = np.load(os.path.join(katalog, _PLIK_MACIERZY), mmap_mode='r')
+        pliki = manifest["pliki"]
+        liczba_wierszy = sum(1 for wpis in pliki if wpis.get("wiersz") is not None)
+        if macierz.shape != (liczba_wierszy, binow_na_dobe(szerokosc_s)) or list(macierz.shape) != manifest["ksztalt"]:
+            return None
+        return macierz, pliki
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def zapisz_cache(katalog, macierz, pliki, szerokosc_s=60):
+    """ Zapis atomowy: pliki tymczasowe podmieniane przez os.replace, manifest na końcu """
+    os.makedirs(katalog, exist_ok=True)
+    tmp_macierz = os.path.join(katalog, _PLIK_MACIERZY + '.tmp')
+    with open(tmp_macierz, 'wb') as f:
+        np.save(f, np.ascontiguousarray(macierz))
+    tmp_manifest = os.path.join(katalog, _PLIK_MANIFESTU + '.tmp')
+    with open(tmp_manifest, 'w', encoding='utf-8') as f:
+        json.dump({"wersja": WERSJA_CACHE, "ksztalt": list(macierz.shape), "szerokosc_s": szerokosc_s,
+                   "pliki": pliki}, f)
+    os.replace(tmp_macierz, os.path.join(katalog, _PLIK_MACIERZY))
+    os.replace(tmp_manifest, os.path.join(katalog, _PLIK_MANIFESTU))
+
+
+# =============================================================================
+# TRYB NA ŻYWO - OBSERWACJA FOLDERU
+# =============================================================================
+class ObserwatorFolderu:
+    """ Dopisuje do silnika nowe pliki CSV pojawiające się w folderze (jako kolejne dni)
+
+    szerokosc_s to szerokość binu plików [s]; domyślnie ta, w której silnik wczytał dane.
+    """
+
+    def __init__(self, engine, sciezka_folderu, interwal=5.0, po_dodaniu=None, pomin_istniejace=True,
+                 szerokosc_s=None):
+        if szerokosc_s is not None and szerokosc_s != engine.szerokosc_s:
+            if len(engine.magazyn):
+                raise ValueError(f"Pliki o binach {szerokosc_s} s nie pasują do wczytanych danych "
+                                 f"({engine.szerokosc_s} s)")
+            engine._ustaw_szerokosc(szerokosc_s)
+        self.engine = engine
+        self.sciezka_folderu = sciezka_folderu
+        self.interwal = interwal
+        self.po_dodaniu = po_dodaniu
+        self._znane = set(self._pliki()) if pomin_istniejace else set()
+        self._rozmiary = {}
+        self._stop = threading.Event()
+        self._watek = None
+
+    def _pliki(self):
+        return [f for f in os.listdir(self.sciezka_folderu) if f.endswith('.csv')]
+
+    def sprawdz(self):
+        """ Jedno przejrzenie folderu; zwraca listę dopisanych plików """
+        dodane = []
+        for plik in sorted(set(self._pliki()) - self._znane):
+            sciezka = os.path.join(self.sciezka_folderu, plik)
+            try:
+                rozmiar = os.path.getsize(sciezka)
+            except OSError:
+                continue
+            # Plik jest brany dopiero, gdy jego rozmiar przestał się zmieniać (zapis zakończony)
+            if self._rozmiary.get(plik) != rozmiar:
+                self._rozmiary[plik] = rozmiar
+                continue
+            del self._rozmiary[plik]
+            self._znane.add(plik)
+            ruch, powod = parsuj_plik_csv(sciezka)
+            if ruch is None:
+                self.engine.raport_wczytania.append({"plik": plik, "status": "pominiety", "powod": powod})
+                continue
+            self.engine.dodaj_dzien(ruch, zrodlo=plik, data=data_z_nazwy(plik))
+            self.engine.raport_wczytania.append({"plik": plik, "status": "ok", "wiersze": len(ruch)})
+            dodane.append(plik)
+        if dodane and self.po_dodaniu: self.po_dodaniu(dodane)
+        return dodane
+
+    def uruchom(self):
+        """ Pętla blokująca (np. dla trybu wsadowego) - kończy ją zatrzymaj() z innego wątku """
+        while not self._stop.is_set():
+            self.sprawdz()
+            self._stop.wait(self.interwal)
+
+    def start(self):
+        self._stop.clear()
+        self._watek = threading.Thread(target=self.uruchom, daemon=True)
+        self._watek.start()
+
+    def zatrzymaj(self):
+        self._stop.set()
+        if self._watek is not None: self._watek.join()
+
+
+# =============================================================================
+# ANALIZA WIELU ENCJI (KOMÓRKI / WIĄZKI)
+# =============================================================================
+KOLUMNA_ENCJI = 'encja'
+# Górna liczba elementów sum skumulowanych (encje x dni x 1441) w jednej paczce - ok. 64 MB niezależnie od liczby dni
+_ELEMENTY_PACZKI_ENCJI = 1 << 23
+
+
+def _gnr_encji(tensor, start_h, end_h):
+    """ TCBH/ADPH/FDMH/margines dla tensora (encje x dni x 1440) jednym wektorowym przebiegiem """
+    liczba_dni = tensor.shape[1]
+    idx_start, idx_end = zakres_minut(start_h, end_h)
+    skumulowane = np.zeros(tensor.shape[:2] + (MINUT_NA_DOBE + 1,))
+    np.cumsum(tensor, axis=2, dtype=np.float64, out=skumulowane[:, :, 1:])
+    profil_skumulowany = skumulowane.sum(axis=1)
+
+    sumy_okien = profil_skumulowany[:, idx_start + OKNO_GODZINY:idx_end + 1] \
+                 - profil_skumulowany[:, idx_start:idx_end - OKNO_GODZINY + 1]
+    tcbh_start = idx_start + np.argmax(sumy_okien, axis=1)
+    val_tcbh = np.take_along_axis(sumy_okien, (tcbh_start - idx_start)[:, None], axis=1)[:, 0] \
+               / OKNO_GODZINY / liczba_dni
+
+    maksima = (skumulowane[:, :, idx_start + OKNO_GODZINY:idx_end + 1]
+               - skumulowane[:, :, idx_start:idx_end - OKNO_GODZINY + 1]).max(axis=2) / OKNO_GODZINY
+    val_adph = maksima.mean(axis=1)
+
+    godziny_zakres = [g for g in range(int(start_h), int(end_h)) if g < 24]
+    if godziny_zakres:
+        granice = profil_skumulowany[:, ::60]
+        profil_godzinowy = (granice[:, 1:] - granice[:, :-1]) / 60 / liczba_dni
+        val_fdmh = profil_godzinowy[:, godziny_zakres].max(axis=1)
+    else:
+        val_fdmh = np.zeros(len(tensor))
+
+    margines_bledu = np.zeros(len(tensor))
+    if liczba_dni > 1:
+        okno = tcbh_start[:, None, None]
+        srednie = (np.take_along_axis(skumulowane, okno + OKNO_GODZINY, axis=2)
+                   - np.take_along_axis(skumulowane, okno, axis=2))[:, :, 0] / OKNO_GODZINY
+        sem = np.std(srednie, axis=1, ddof=1) / np.sqrt(liczba_dni)
+        margines_bledu = kwantyl_t(liczba_dni - 1) * sem
+    return tcbh_start, val_tcbh, val_adph, val_fdmh, margines_bledu
+
+
+def _rozmiar_paczki_encji(liczba_dni):
+    """ Liczba encji w paczce mieszcząca się w budżecie elementów (co najmniej jedna) """
+    return max(1, _ELEMENTY_PACZKI_ENCJI // (max(liczba_dni, 1) * (MINUT_NA_DOBE + 1)))
+
+
+def _gnr_paczki_encji(argumenty):
+    tensor, start_h, end_h = argumenty
+    rozmiar = _rozmiar_paczki_encji(tensor.shape[1])
+    wyniki = [_gnr_encji(tensor[p:p + rozmiar], start_h, end_h) for p in range(0, len(tensor), rozmiar)]
+    return [np.concatenate(kolumna) for kolumna in zip(*wyniki)]
+
+
+def oblicz_gnr_encji(tensor, start_h=0, end_h=24, encje=None, procesy=1):
+    """ Tabela wyników GNR dla wszystkich encji tensora (encje x dni x 1440), opcjonalnie na wielu rdzeniach """
+    import pandas as pd
+    liczba_encji, liczba_dni = tensor.shape[:2]
+    idx_start, idx_end = zakres_minut(start_h, end_h)
+    if liczba_encji == 0 or liczba_dni == 0 or idx_end - idx_start < OKNO_GODZINY: return None
+    if encje is None: encje = list(range(liczba_encji))
+
+    if procesy == 1:
+        kolumny = _gnr_paczki_encji((tensor, start_h, end_h))
+    else:
+        liczba_procesow = procesy or os.cpu_count() or 1
+        rozmiar = max(_rozmiar_paczki_encji(liczba_dni), -(-liczba_encji // liczba_procesow))
+        zadania = [(tensor[p:p + rozmiar], start_h, end_h) for p in range(0, liczba_encji, rozmiar)]
+        with ProcessPoolExecutor(max_workers=procesy) as pula:
+            czesci = list(pula.map(_gnr_paczki_encji, zadania))
+        kolumny = [np.concatenate(kolumna) for kolumna in zip(*czesci)]
+
+    tcbh_start, val_tcbh, val_adph, val_fdmh, margines_bledu = kolumny
+    return pd.DataFrame({
+        "encja": encje,
+        "dni": liczba_dni,
+        "tcbh_val": val_tcbh,
+        "tcbh_time": [format_tcbh(int(t)) for t in tcbh_start],
+        "tcbh_start": tcbh_start,
+        "adph_val": val_adph,
+        "fdmh_val": val_fdmh,
+        "error_margin": margines_bledu,
+    })
+
+
+def parsuj_plik_csv_encji(sciezka, kolumna_encji=KOLUMNA_ENCJI):
+    """ Plik dnia z wieloma encjami: zwraca ((id encji, minuta w dniu encji, ruch_erl), None) albo (None, powód) """
+    import pandas as pd
+    try:
+        fmt = wykryj_format_csv(sciezka)
+        if fmt is None: return None, f"brak kolumny {KOLUMNA_RUCHU}"
+        sep, decimal = fmt
+        df = pd.read_csv(sciezka, sep=sep, decimal=decimal, usecols=[kolumna_encji, KOLUMNA_RUCHU])
+        kolumna = df[KOLUMNA_RUCHU]
+        if not pd.api.types.is_numeric_dtype(kolumna):
+            kolumna = kolumna.astype(str).str.replace(',', '.')
+        ruch = pd.to_numeric(kolumna, errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+        ids = df[kolumna_encji].astype(str)
+        # Wiersze każdej encji w kolejności pliku to kolejne minuty jej doby
+        minuty = ids.groupby(ids, sort=False).cumcount().to_numpy()
+        return (ids.to_numpy(), minuty, ruch), None
+    except (OSError, ValueError) as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+# =============================================================================
+# WYMIAROWANIE (ERLANG B / ERLANG C)
+# =============================================================================
+GOS_DOMYSLNY = 0.01
+_ITERACJE_NEWTONA = 60
+_TOLERANCJA_NEWTONA = 1e-12
+_MIN_TABLICY = 64
+
+
+def erlang_b(obciazenie, laczy):
+    """ Prawdopodobieństwo blokady Erlang B (wektorowo, z rozgłaszaniem obciążeń i liczb łączy)
+
+    Rekurencja B(k) = A*B(k-1) / (k + A*B(k-1)) trzyma wartości w [0, 1] - bez silni i przepełnień.
+    """
+    obciazenie, laczy = np.broadcast_arrays(np.asarray(obciazenie, dtype=np.float64),
+                                            np.asarray(laczy, dtype=np.int64))
+    # Po sortowaniu rosnąco po liczbie łączy aktywne w kroku k tworzą ciągły ogon - krok to działanie na wycinku,
+    # bez maski i zbierania/rozpraszania elementów
+    kolejnosc = np.argsort(laczy, axis=None, kind='stable')
+    n = laczy.reshape(-1)[kolejnosc]
+    a = obciazenie.reshape(-1)[kolejnosc]
+    b = np.ones(len(n))
+    poczatki = np.searchsorted(n, np.arange(1, int(n.max(initial=0)) + 1), side='left')
+    for k, s in enumerate(poczatki.tolist(), 1):
+        ab = a[s:] * b[s:]
+        b[s:] = ab / (k + ab)
+    wynik = np.empty(obciazenie.shape)
+    wynik.reshape(-1)[kolejnosc] = b
+    return wynik
+
+
+def _erlang_b_kolejnych(obciazenia, n0):
+    """ Erlang B dla obciążeń[i] przy n0 + i łączach - element i wypada z rekurencji po swoim kroku """
+    b = np.ones(len(obciazenia))
+    for k in range(1, n0 + len(obciazenia)):
+        s = max(0, k - n0)
+        ab = obciazenia[s:] * b[s:]
+        b[s:] = ab / (k + ab)
+    return b
+
+
+def erlang_c(obciazenie, laczy):
+    """ Prawdopodobieństwo oczekiwania Erlang C (1 gdy obciążenie >= liczba łączy) """
+    b = erlang_b(obciazenie, laczy)
+    obciazenie, laczy = np.broadcast_arrays(np.asarray(obciazenie, dtype=np.float64), np.asarray(laczy))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        c = laczy * b / (laczy - obciazenie * (1 - b))
+    return np.where(laczy > obciazenie, c, 1.0)
+
+
+class TablicaErlangaB:
+    """ Odwrócona tablica Erlanga B dla jednego GoS: pojemnosci[n-1] = największe obciążenie obsłużone przez n łączy
+
+    Budowana raz (bisekcja dla wszystkich n naraz) i rozszerzana tylko, gdy przyjdzie większe obciążenie;
+    wymiarowanie dowolnej liczby wiązek to potem jedno searchsorted.
+    """
+
+    def __init__(self, gos):
+        if not 0 < gos < 1: raise ValueError(f"GoS musi być w przedziale (0, 1), otrzymano {gos}")
+        self.gos = gos
+        self.pojemnosci = np.zeros(0)
+        self._blokada = threading.Lock()
+
+    def _rozszerz(self, do_laczy):
+        n0 = len(self.pojemnosci) + 1
+        n = np.arange(n0, do_laczy + 1)
+        # Ruch obsłużony A*(1-B) <= n, więc B <= GoS wymaga A <= n / (1 - GoS)
+        dol = np.zeros(len(n))
+        gora = n / (1 - self.gos)
+        a = np.maximum(n - np.sqrt(n), 0.5 * gora)
+        # Newton z przedziałem ochronnym: dB/dA = B * (n/A - 1 + B); krok poza przedział -> bisekcja
+        for _ in range(_ITERACJE_NEWTONA):
+            b = _erlang_b_kolejnych(a, n0)
+            za_duza = b > self.gos
+            gora = np.where(za_duza, a, gora)
+            dol = np.where(za_duza, dol, a)
+            krok = (b - self.gos) / (b * (n / a - 1 + b))
+            zbiezne = np.abs(krok) <= _TOLERANCJA_NEWTONA * a
+            if zbiezne.all(): break
+            nowe = a - krok
+            poza = ~((nowe > dol) & (nowe < gora))
+            nowe[poza] = (dol[poza] + gora[poza]) / 2
+            a = np.where(zbiezne, a, nowe)
+        self.pojemnosci = np.concatenate([self.pojemnosci, a])
+
+    def laczy(self, obciazenia):
+        """ Najmniejsza liczba łączy z blokadą <= GoS dla każdego obciążenia [Erl] """
+        obciazenia = np.asarray(obciazenia, dtype=np.float64)
+        najwieksze = float(obciazenia.max(initial=0))
+        with self._blokada:
+            while not len(self.pojemnosci) or self.pojemnosci[-1] < najwieksze:
+                # Zapas ok. 4 odchyleń ruchu Poissona ponad obciążenie - zwykle wystarcza jedno rozszerzenie
+                potrzebne = int(najwieksze + 4 * np.sqrt(najwieksze)) + 1
+                self._rozszerz(max(_MIN_TABLICY, potrzebne, len(self.pojemnosci) + len(self.pojemnosci) // 4))
+            pojemnosci = self.pojemnosci
+        wynik = np.searchsorted(pojemnosci, obciazenia, side='left') + 1
+        return np.where(obciazenia > 0, wynik, 0)
+
+
+_TABLICE_ERLANGA = {}
+_BLOKADA_TABLIC = threading.Lock()
+
+
+def tablica_erlanga_b(gos):
+    """ Wspólna (zapamiętana) tablica dla danego GoS - kolejne zapytania korzystają z już policzonych pojemności """
+    with _BLOKADA_TABLIC:
+        if gos not in _TABLICE_ERLANGA: _TABLICE_ERLANGA[gos] = TablicaErlangaB(gos)
+        return _TABLICE_ERLANGA[gos]
+
+
+def laczy_erlang_c(obciazenia, cel_oczekiwania, czas_obslugi=None, czas_oczekiwania=0):
+    """ Najmniejsza liczba łączy, przy której P(oczekiwanie > czas_oczekiwania) <= cel_oczekiwania
+
+    Bez czasów (albo z czas_oczekiwania=0) celem jest samo prawdopodobieństwo oczekiwania Erlang C.
+    """
+    obciazenia = np.asarray(obciazenia, dtype=np.float64)
+    wynik = np.zeros(obciazenia.shape, dtype=np.int64)
+    idx = np.flatnonzero(obciazenia > 0)
+    a = obciazenia.reshape(-1)[idx]
+    n = np.floor(a).astype(np.int64) + 1
+    b = erlang_b(a, n)
+    wyklad = czas_oczekiwania / czas_obslugi if czas_obslugi and czas_oczekiwania else 0.0
+    plaski = wynik.reshape(-1)
+    while len(idx):
+        c = n * b / (n - a * (1 - b))
+        spelnia = c * np.exp(-(n - a) * wyklad) <= cel_oczekiwania
+        plaski[idx[spelnia]] = n[spelnia]
+        idx, a, n, b = idx[~spelnia], a[~spelnia], n[~spelnia] + 1, b[~spelnia]
+        b = a * b / (n + a * b)
+    return wynik
+
+
+def wymiaruj_obciazenia(obciazenia, gos=GOS_DOMYSLNY, cel_oczekiwania=None, czas_obslugi=None, czas_oczekiwania=0):
+    """ Wymiarowanie wsadowe: słownik tablic (łącza Erlang B, blokada, opcjonalnie łącza Erlang C) """
+    obciazenia = np.asarray(obciazenia, dtype=np.float64)
+    laczy = tablica_erlanga_b(gos).laczy(obciazenia)
+    wynik = {"laczy": laczy, "blokada": erlang_b(obciazenia, laczy)}
+    if cel_oczekiwania is not None:
+        wynik["laczy_c"] = laczy_erlang_c(obciazenia, cel_oczekiwania, czas_obslugi, czas_oczekiwania)
+    return wynik
+
+
+def wymiaruj(wynik, gos=GOS_DOMYSLNY, cel_oczekiwania=None, czas_obslugi=None, czas_oczekiwania=0):
+    """ Etap po oblicz_gnr: liczba łączy dla TCBH i dla górnej granicy przedziału ufności (TCBH + margines) """
+    obciazenia = np.array([wynik["tcbh_val"], wynik["tcbh_val"] + wynik["error_margin"]])
+    tabela = wymiaruj_obciazenia(obciazenia, gos, cel_oczekiwania, czas_obslugi, czas_oczekiwania)
+    wymiarowanie = {"gos": gos, "obciazenie": float(obciazenia[0]), "obciazenie_gorne": float(obciazenia[1])}
+    for klucz, wartosci in tabela.items():
+        wymiarowanie[klucz] = wartosci[0].item()
+        wymiarowanie[klucz + "_gorne"] = wartosci[1].item()
+    return wymiarowanie
+
+
+# =============================================================================
+# SYMULACJA MONTE CARLO
+# =============================================================================
+PACZKA_SYMULACJI = 64
+
+
+def wczytaj_baze_symulacji(sciezka_czas, sciezka_int):
+    """ Zwraca (pula czasów obsługi [s], znormalizowany profil 1440 minut) """
+    import pandas as pd
+    df_czas = pd.read_csv(sciezka_czas, header=None, names=['czas_trwania'], on_bad_lines='skip')
+    df_czas['czas_trwania'] = pd.to_numeric(df_czas['czas_trwania'], errors='coerce')
+    df_czas = df_czas.dropna()
+    czasy = df_czas['czas_trwania'].values
+
+    df_int = pd.read_csv(sciezka_int, sep=r'\s+', header=None, names=['minuta', 'intensywnosc_norm_str'])
+    df_int['intensywnosc_norm'] = df_int['intensywnosc_norm_str'].str.replace(',', '.').astype(float)
+    df_int = df_int[['minuta', 'intensywnosc_norm']].dropna()
+    df_int['minuta'] = df_int['minuta'].astype(int)
+
+    df_pelny = pd.DataFrame({'minuta': range(1, MINUT_NA_DOBE + 1)})
+    df_pelny = pd.merge(df_pelny, df_int, on='minuta', how='left')
+    df_pelny['intensywnosc_norm'] = df_pelny['intensywnosc_norm'].fillna(0)
+
+    prob_sum = df_pelny['intensywnosc_norm'].sum()
+    if not np.isclose(prob_sum, 1.0) and prob_sum > 0:
+        df_pelny['intensywnosc_norm'] = df_pelny['intensywnosc_norm'] / prob_sum
+
+    return czasy, df_pelny['intensywnosc_norm'].values
+
+
+def symuluj_dni(pula_czasow, profil_prawd, c_total_base, ile_dni, rng, out=None, postep=None, anuluj=None):
+    """ Generuje ile_dni dni naraz (paczkami po PACZKA_SYMULACJI) z generatora rng """
+    if out is None: out = np.empty((ile_dni, MINUT_NA_DOBE))
+    minuty = np.arange(MINUT_NA_DOBE)
+    for p in range(0, ile_dni, PACZKA_SYMULACJI):
+        zglos_postep(postep, anuluj, p, ile_dni, "dni zasymulowane")
+        n = min(PACZKA_SYMULACJI, ile_dni - p)
+        # Liczba wywołań dnia: szum gaussowski 5% wokół wartości bazowej
+        c_new = rng.normal(loc=c_total_base, scale=c_total_base * 0.05, size=n).astype(np.int64)
+        np.maximum(c_new, 1, out=c_new)
+
+        # Średni czas obsługi dnia z losowania ze zwracaniem - jedno losowanie dla całej paczki
+        nowe_czasy = pula_czasow[rng.integers(0, len(pula_czasow), size=c_new.sum())]
+        poczatki = np.concatenate(([0], np.cumsum(c_new)[:-1]))
+        h_new_min = np.add.reduceat(nowe_czasy, poczatki) / c_new / 60.0
+
+        # Przesunięcie profilu o +/- 2h (odpowiednik np.roll dla każdego dnia)
+        shift = rng.integers(-120, 121, size=n)
+        profile_shifted = profil_prawd[(minuty - shift[:, None]) % MINUT_NA_DOBE]
+        wywolania = rng.multinomial(c_new, profile_shifted)
+        np.multiply(wywolania, h_new_min[:, None], out=out[p:p + n], casting='unsafe')
+    zglos_postep(postep, None, ile_dni, ile_dni, "dni zasymulowane")
+    return out
+
+
+def wzgledna_polszerokosc(wynik):
+    """ Połowa szerokości 95% przedziału ufności TCBH względem wartości TCBH (inf gdy jeszcze nieokreślona) """
+    if wynik is None or wynik["dni"] < 2 or not wynik["tcbh_val"] > 0: return np.inf
+    if not np.isfinite(wynik["error_margin"]): return np.inf
+    return wynik["error_margin"] / wynik["tcbh_val"]
+
+
+def symuluj_do_precyzji(pula_czasow, profil_prawd, c_total_base, precyzja, rng, magazyn=None, start_h=0, end_h=24,
+                        max_dni=3650, paczka=PACZKA_SYMULACJI, postep=None, anuluj=None):
+    """ Symulacja sekwencyjna: paczki dni aż względna połowa przedziału ufności TCBH spadnie do precyzja
+
+    Statystyki średnich dziennych są aktualizowane przyrostowo (IndeksPrzyrostowy), więc sprawdzenie
+    po każdej paczce kosztuje tyle, ile nowe dni. Zwraca (magazyn, indeks, wynik, czy_osiagnieto).
+    """
+    if magazyn is None: magazyn = MagazynDni()
+    indeks = IndeksPrzyrostowy(magazyn.macierz)
+    wynik = indeks.oblicz(start_h, end_h)
+    zasymulowane = 0
+    while wzgledna_polszerokosc(wynik) > precyzja and zasymulowane < max_dni:
+        zglos_postep(postep, anuluj, zasymulowane, max_dni, "dni zasymulowane")
+        n = min(paczka, max_dni - zasymulowane)
+        dni = magazyn.nowe_dni(n, zrodlo="symulacja")
+        symuluj_dni(pula_czasow, profil_prawd, c_total_base, n, rng, out=dni)
+        for wiersz in dni: indeks.dopisz_dzien(wiersz)
+        zasymulowane += n
+        wynik = indeks.oblicz(start_h, end_h)
+    zglos_postep(postep, None, zasymulowane, zasymulowane, "dni zasymulowane")
+    return magazyn, indeks, wynik, wzgledna_polszerokosc(wynik) <= precyzja
+
+
+def statystyki_rozrzutu(wartosci):
+    return {
+        "srednia": float(np.mean(wartosci)),
+        "std": float(np.std(wartosci, ddof=1)) if len(wartosci) > 1 else 0.0,
+        "min": float(np.min(wartosci)),
+        "p5": float(np.percentile(wartosci, 5)),
+        "p50": float(np.percentile(wartosci, 50)),
+        "p95": float(np.percentile(wartosci, 95)),
+        "max": float(np.max(wartosci)),
+    }
+
+
+_baza_robotnika = None
+
+
+def _inicjuj_robotnika_symulacji(pula_czasow, profil_prawd, c_total_base, ile_dni, start_h, end_h):
+    global _baza_robotnika
+    _baza_robotnika = (pula_czasow, profil_prawd, c_total_base, ile_dni, start_h, end_h)
+
+
+def _przebieg_replikacji(ziarno):
+    pula_czasow, profil_prawd, c_total_base, ile_dni, start_h, end_h = _baza_robotnika
+    macierz = symuluj_dni(pula_czasow, profil_prawd, c_total_base, ile_dni, np.random.default_rng(ziarno))
+    wynik = IndeksAnalizy(macierz).oblicz(start_h, end_h)
+    return (wynik["tcbh_val"], wynik["tcbh_start"], wynik["adph_val"], wynik["fdmh_val"],
+            wynik["error_margin"])
+
+
+def symuluj_replikacje(pula_czasow, profil_prawd, c_total_base, liczba_przebiegow=1000, ile_dni=365,
+                       start_h=0, end_h=24, seed=None, procesy=None):
+    """ Niezależne przebiegi symulacji (osobne strumienie RNG) i rozrzut TCBH/ADPH/FDMH między nimi """
+    ziarna = np.random.SeedSequence(seed).spawn(liczba_przebiegow)
+    baza = (pula_czasow, profil_prawd, c_total_base, ile_dni, start_h, end_h)
+    if procesy == 1:
+        _inicjuj_robotnika_symulacji(*baza)
+        wyniki = [_przebieg_replikacji(z) for z in ziarna]
+    else:
+        with ProcessPoolExecutor(max_workers=procesy, initializer=_inicjuj_robotnika_symulacji,
+                                 initargs=baza) as pula:
+            paczka = max(1, liczba_przebiegow // (4 * (procesy or os.cpu_count() or 1)))
+            wyniki = list(pula.map(_przebieg_replikacji, ziarna, chunksize=paczka))
+
+    wyniki = np.array(wyniki, dtype=np.float64)
+    return {
+        "przebiegi": liczba_przebiegow,
+        "dni": ile_dni,
+        "seed": seed,
+        "tcbh_val": statystyki_rozrzutu(wyniki[:, 0]),
+        "tcbh_start": statystyki_rozrzutu(wyniki[:, 1]),
+        "adph_val": statystyki_rozrzutu(wyniki[:, 2]),
+        "fdmh_val": statystyki_rozrzutu(wyniki[:, 3]),
+        "error_margin": statystyki_rozrzutu(wyniki[:, 4]),
+        "wyniki": wyniki,
+    }
+
+
+# =============================================================================
+# LOGIKA BIZNESOWA
+# =============================================================================
+class TrafficEngine:
+    def __init__(self, dtype=np.float64):
+        self.magazyn = MagazynDni(dtype=dtype)
+        self.pomiary = BEZ_POMIAROW
+        self.wyczysc_dane()
+
+    def wlacz_pomiary(self, log=None):
+        """ Pomiary czasów etapów; raporty w self.pomiary.raporty i (z log) w pliku JSON, linia na operację """
+        self.pomiary = Pomiary(log=log)
+        return self.pomiary
+
+    def wylacz_pomiary(self):
+        self.pomiary = BEZ_POMIAROW
+
+    def wyczysc_dane(self):
+        self.magazyn.wyczysc()
+        self.szerokosc_s = 60
+        self.magazyn_drobny = None
+        self._piramida = None
+        self._wersja_piramidy = None
+        self._indeksy_poziomow = {}
+        self.tcbh_start_index = 0
+        self.raport_wczytania = []
+        self.tensor_encji = None
+        self.encje = []
+        self._dzien_otwarty = False
+        self._minuta_otwarta = 0
+        self._indeks = None
+        self._wersja_indeksu = None
+        self.raport_symulacji = None
+
+    def indeks(self):
+        """ Indeks analizy aktualnych danych - przebudowywany tylko po zmianie magazynu """
+        if self._indeks is None or self._wersja_indeksu != self.magazyn.wersja:
+            with self.pomiary.etap("indeks (sumy skumulowane)", dni=len(self.magazyn)):
+                self._indeks = IndeksAnalizy(self.magazyn.macierz)
+            self._wersja_indeksu = self.magazyn.wersja
+        return self._indeks
+
+    def piramida(self):
+        """ Piramida rozdzielczości aktualnych danych - budowana raz na wersję magazynu """
+        if self._piramida is None or self._wersja_piramidy != self.magazyn.wersja:
+            drobna = self.magazyn_drobny.macierz if self.magazyn_drobny is not None else None
+            self._piramida = Piramida(self.magazyn.macierz, self.szerokosc_s, drobna)
+            self._wersja_piramidy = self.magazyn.wersja
+            self._indeksy_poziomow = {}
+        return self._piramida
+
+    def _indeks_poziomu(self, szerokosc_s):
+        """ Indeks analizy na poziomie piramidy; minutowy to zwykły indeks() (także w trybie na żywo)
+
+        W trybie na żywo zawsze minuty: indeks przyrostowy jest dokładny dla każdej szerokości binu, a poziom
+        grubszy trzeba by budować od nowa po każdym dopisanym dniu.
+        """
+        na_zywo = isinstance(self._indeks, IndeksPrzyrostowy) and self._wersja_indeksu == self.magazyn.wersja
+        if szerokosc_s == 60 or na_zywo: return self.indeks()
+        piramida = self.piramida()
+        if szerokosc_s not in self._indeksy_poziomow:
+            with self.pomiary.etap("indeks poziomu piramidy", szerokosc_s=szerokosc_s, dni=len(self.magazyn)):
+                self._indeksy_poziomow[szerokosc_s] = IndeksAnalizy(piramida.poziom(szerokosc_s), szerokosc_s)
+        return self._indeksy_poziomow[szerokosc_s]
+
+    def _ustaw_szerokosc(self, szerokosc_s):
+        """ Rozdzielczość danych źródłowych; biny krótsze niż minuta trafiają też do osobnego magazynu """
+        binow_na_dobe(szerokosc_s)
+        self.szerokosc_s = szerokosc_s
+        self.magazyn_drobny = MagazynDni(self.magazyn.dtype, szerokosc_s=szerokosc_s) if szerokosc_s < 60 else None
+
+    def _dodaj_dzien_zrodla(self, ruch_erl, zrodlo=None, data=None):
+        """ Dzień w rozdzielczości źródła: krótsze dni dopełniane zerami, dłuższe przycinane do doby """
+        if self.szerokosc_s == 60: return self.magazyn.dodaj_dzien(ruch_erl, zrodlo=zrodlo, data=data)
+        if self.magazyn_drobny is not None:
+            wiersz = self.magazyn_drobny.dodaj_dzien(ruch_erl, zrodlo=zrodlo, data=data)
+        else:
+            wiersz = np.zeros(binow_na_dobe(self.szerokosc_s))
+            n = min(len(ruch_erl), len(wiersz))
+            wiersz[:n] = ruch_erl[:n]
+        return self.magazyn.dodaj_dzien(zmien_rozdzielczosc(wiersz, self.szerokosc_s, 60), zrodlo=zrodlo, data=data)
+
+    def _macierz_zrodla(self):
+        if self.magazyn_drobny is not None: return self.magazyn_drobny.macierz
+        return self.magazyn.macierz[:, ::self.szerokosc_s // 60]
+
+    def _indeks_na_zywo(self):
+        if not isinstance(self._indeks, IndeksPrzyrostowy) or self._wersja_indeksu != self.magazyn.wersja:
+            # Jednorazowe przejście po historii - kolejne dni i minuty są już tylko dopisywane
+            zamkniete = len(self.magazyn) - self._dzien_otwarty
+            self._indeks = IndeksPrzyrostowy(self.magazyn.macierz[:zamkniete])
+            if self._dzien_otwarty: self._indeks.ustaw_otwarty(self.magazyn.macierz[-1])
+        return self._indeks
+
+    def dodaj_dzien(self, ruch_erl, zrodlo=None, data=None):
+        """ Tryb na żywo: dopisuje pełny dzień; wyniki aktualizowane w czasie zależnym tylko od nowych danych
+
+        Dzień jest w szerokości binu wczytanych danych (szerokosc_s) - jak pliki folderu, z którego pochodzą.
+        """
+        indeks = self._indeks_na_zywo()
+        indeks.zamknij_otwarty()
+        self._dzien_otwarty = False
+        wiersz = self._dodaj_dzien_zrodla(ruch_erl, zrodlo=zrodlo, data=data)
+        indeks.dopisz_dzien(wiersz)
+        self._wersja_indeksu = self.magazyn.wersja
+
+    def dodaj_minuty(self, ruch_erl, zrodlo=None, data=None):
+        """ Tryb na żywo: kolejne minuty bieżącego dnia; po 1440 minutach dzień się zamyka i zaczyna następny """
+        if self.szerokosc_s != 60:
+            raise ValueError(f"dodaj_minuty wymaga danych minutowych (wczytane mają biny {self.szerokosc_s} s)")
+        indeks = self._indeks_na_zywo()
+        ruch = np.asarray(ruch_erl, dtype=np.float64)
+        while len(ruch):
+            if not self._dzien_otwarty:
+                self.magazyn.nowy_dzien(zrodlo=zrodlo, data=data)
+                self._dzien_otwarty = True
+                self._minuta_otwarta = 0
+            wiersz = self.magazyn.macierz[-1]
+            ile = min(len(ruch), MINUT_NA_DOBE - self._minuta_otwarta)
+            wiersz[self._minuta_otwarta:self._minuta_otwarta + ile] = ruch[:ile]
+            self._minuta_otwarta += ile
+            ruch = ruch[ile:]
+            indeks.ustaw_otwarty(wiersz)
+            if self._minuta_otwarta == MINUT_NA_DOBE:
+                indeks.zamknij_otwarty()
+                self._dzien_otwarty = False
+        self.magazyn.wersja += 1
+        self._wersja_indeksu = self.magazyn.wersja
+
+    def _sciezki_bazy(self, sciezka_czas, sciezka_int):
+        if not os.path.isabs(sciezka_czas): sciezka_czas = resource_path(sciezka_czas)
+        if not os.path.isabs(sciezka_int): sciezka_int = resource_path(sciezka_int)
+        for sciezka in (sciezka_czas, sciezka_int):
+            if not os.path.exists(sciezka): raise FileNotFoundError(f"Brak pliku: {sciezka}")
+        return sciezka_czas, sciezka_int
+
+    @mierzona("wczytaj_baze_i_symuluj")
+    def wczytaj_baze_i_symuluj(self, sciezka_czas, sciezka_int, ile_dni=31, seed=None, postep=None, anuluj=None):
+        try:
+            self.wyczysc_dane()
+            try:
+                sciezka_czas, sciezka_int = self._sciezki_bazy(sciezka_czas, sciezka_int)
+            except FileNotFoundError as e:
+                return False, str(e)
+
+            with self.pomiary.etap("baza symulacji (pliki)"):
+                czasy, profil = wczytaj_baze_symulacji(sciezka_czas, sciezka_int)
+            h_min = czasy.mean() / 60.0
+            c_total = len(czasy)
+
+            self.magazyn.rezerwuj(ile_dni + 1)
+            self.magazyn.dodaj_dzien(profil * c_total * h_min, zrodlo=os.path.basename(sciezka_int))
+            dni = self.magazyn.nowe_dni(ile_dni, zrodlo="symulacja")
+            with self.pomiary.etap("symulacja dni", dni=ile_dni):
+                symuluj_dni(czasy, profil, c_total, ile_dni, np.random.default_rng(seed), out=dni, postep=postep,
+                            anuluj=anuluj)
+
+            return True, "Symulacja OK."
+        except Anulowano:
+            self.wyczysc_dane()
+            return False, "Anulowano."
+        except Exception as e:
+            return False, f"Błąd symulacji: {str(e)}"
+
+    @mierzona("symuluj_do_precyzji")
+    def symuluj_do_precyzji(self, sciezka_czas, sciezka_int, precyzja=0.05, start_h=0, end_h=24, max_dni=3650,
+                            paczka=PACZKA_SYMULACJI, seed=None, postep=None, anuluj=None):
+        """ Jak wczytaj_baze_i_symuluj, ale dni przybywa do osiągnięcia względnej precyzji TCBH (albo max_dni) """
+        try:
+            self.wyczysc_dane()
+            try:
+                sciezka_czas, sciezka_int = self._sciezki_bazy(sciezka_czas, sciezka_int)
+            except FileNotFoundError as e:
+                return False, str(e)
+
+            czasy, profil = wczytaj_baze_symulacji(sciezka_czas, sciezka_int)
+            c_total = len(czasy)
+            self.magazyn.dodaj_dzien(profil * c_total * czasy.mean() / 60.0, zrodlo=os.path.basename(sciezka_int))
+            _, self._indeks, wynik, osiagnieto = symuluj_do_precyzji(
+                czasy, profil, c_total, precyzja, np.random.default_rng(seed), self.magazyn, start_h, end_h,
+                max_dni, paczka, postep, anuluj)
+            self._wersja_indeksu = self.magazyn.wersja
+
+            dni = len(self.magazyn) - 1
+            self.raport_symulacji = {"dni": dni, "precyzja": precyzja,
+                                     "osiagnieta": float(wzgledna_polszerokosc(wynik)), "osiagnieto": bool(osiagnieto)}
+            if not osiagnieto:
+                return True, f"Symulacja OK ({dni} dni). Nie osiągnięto precyzji {precyzja:.1%} w limicie dni."
+            return True, f"Symulacja OK ({dni} dni do precyzji {precyzja:.1%})."
+        except Anulowano:
+            self.wyczysc_dane()
+            return False, "Anulowano."
+        except Exception as e:
+            return False, f"Błąd symulacji: {str(e)}"
+
+    def _symuluj_dzien(self, pula_czasow, profil_prawd, c_total_base, wiersz, rng=None):
+        if rng is None: rng = np.random.default_rng()
+        symuluj_dni(pula_czasow, profil_prawd, c_total_base, 1, rng, out=wiersz[None, :])
+        return wiersz
+
+    def symuluj_replikacje(self, sciezka_czas, sciezka_int, liczba_przebiegow=1000, ile_dni=365,
+                           start_h=0, end_h=24, seed=None, procesy=None):
+        sciezka_czas, sciezka_int = self._sciezki_bazy(sciezka_czas, sciezka_int)
+        czasy, profil = wczytaj_baze_symulacji(sciezka_czas, sciezka_int)
+        return symuluj_replikacje(czasy, profil, len(czasy), liczba_przebiegow, ile_dni,
+                                  start_h, end_h, seed, procesy)
+
+    @mierzona("wczytaj_folder_csv")
+    def wczytaj_folder_csv(self, sciezka_folderu, robotnicy=None, procesy=False, cache=True, katalog_cache=None,
+                           szerokosc_s=60, postep=None, anuluj=None):
+        """ Dni z plików CSV folderu; szerokosc_s to szerokość binu w plikach (np. 10 albo 900 sekund) """
+        self.wyczysc_dane()
+        try:
+            self._ustaw_szerokosc(szerokosc_s)
+            pliki = sorted(f for f in os.listdir(sciezka_folderu) if f.endswith('.csv'))
+            if not pliki: return False, "Brak plików CSV w tym folderze."
+
+            katalog = katalog_cache_folderu(sciezka_folderu, katalog_cache)
+            with self.pomiary.etap("cache: odczyt manifestu i mapowanie"):
+                zapisane = wczytaj_cache(katalog, szerokosc_s) if cache else None
+            macierz_cache, wpisy_cache = zapisane if zapisane else (None, [])
+            poprzednie = {wpis["plik"]: wpis for wpis in wpisy_cache}
+
+            # Plik jest brany z cache tylko przy zgodnym rozmiarze i czasie modyfikacji
+            wpisy = []
+            do_parsowania = []
+            for plik in pliki:
+                st = os.stat(os.path.join(sciezka_folderu, plik))
+                wpis = {"plik": plik, "rozmiar": st.st_size, "mtime_ns": st.st_mtime_ns}
+                stary = poprzednie.get(plik)
+                if stary and stary.get("rozmiar") == st.st_size and stary.get("mtime_ns") == st.st_mtime_ns:
+                    wpis.update({k: stary[k] for k in ("wiersz", "wiersze", "powod") if k in stary})
+                else:
+                    do_parsowania.append(plik)
+                wpisy.append(wpis)
+
+            bez_zmian = not do_parsowania and len(wpisy) == len(wpisy_cache) \
+                and [w["wiersz"] for w in wpisy if w.get("wiersz") is not None] == list(range(len(macierz_cache)))
+            if bez_zmian and szerokosc_s == 60:
+                # Nic się nie zmieniło - magazyn korzysta wprost z macierzy zmapowanej z dysku
+                ok_wpisy = [w for w in wpisy if w.get("wiersz") is not None]
+                self.magazyn.przejmij(macierz_cache, [w["plik"] for w in ok_wpisy],
+                                      [data_z_nazwy(w["plik"]) for w in ok_wpisy])
+                licznik = self._raport_z_wpisow(wpisy, z_cache=True)
+            else:
+                with self.pomiary.etap("parsowanie CSV i dopełnienie do doby", pliki=len(do_parsowania),
+                                       pliki_z_cache=len(wpisy) - len(do_parsowania)):
+                    licznik = self._wczytaj_zmienione(sciezka_folderu, wpisy, do_parsowania, macierz_cache,
+                                                      robotnicy, procesy, postep, anuluj)
+                if cache and licznik and not bez_zmian:
+                    try:
+                        with self.pomiary.etap("cache: zapis", dni=licznik):
+                            zapisz_cache(katalog, self._macierz_zrodla(), wpisy, szerokosc_s)
+                    except OSError:
+                        pass  # Brak prawa zapisu - cache jest tylko optymalizacją
+
+            if licznik < 1: return False, "Brak poprawnych plików CSV."
+            with self.pomiary.etap("piramida rozdzielczości"):
+                self.piramida()
+            pominiete = len(pliki) - licznik
+            return True, f"Wczytano {licznik} plików." + (f" Pominięto {pominiete}." if pominiete else "")
+        except Anulowano:
+            self.wyczysc_dane()
+            return False, "Anulowano."
+        except Exception as e:
+            return False, f"Błąd odczytu: {str(e)}"
+
+    def _wczytaj_zmienione(self, sciezka_folderu, wpisy, do_parsowania, macierz_cache, robotnicy, procesy,
+                           postep=None, anuluj=None):
+        """ Składa magazyn w kolejności plików: wiersze z cache + świeżo sparsowane nowe/zmienione pliki """
+        self.magazyn.rezerwuj(len(wpisy))
+        if self.magazyn_drobny is not None: self.magazyn_drobny.rezerwuj(len(wpisy))
+        sparsowane = parsuj_pliki_csv([os.path.join(sciezka_folderu, p) for p in do_parsowania], robotnicy, procesy)
+        zmienione = set(do_parsowania)
+        try:
+            self._dopisz_wpisy(wpisy, zmienione, sparsowane, macierz_cache, postep, anuluj)
+        finally:
+            sparsowane.close()
+        return len(self.magazyn)
+
+    def _dopisz_wpisy(self, wpisy, zmienione, sparsowane, macierz_cache, postep, anuluj):
+        licznik = 0
+        for i, wpis in enumerate(wpisy):
+            zglos_postep(postep, anuluj, i, len(wpisy), "pliki wczytane")
+            plik = wpis["plik"]
+            if plik in zmienione:
+                ruch, powod = next(sparsowane)
+                wpis.pop("wiersz", None)
+                if ruch is None:
+                    wpis["powod"] = powod
+                    self.raport_wczytania.append({"plik": plik, "status": "pominiety", "powod": powod})
+                    continue
+                wpis["wiersze"] = len(ruch)
+                self.raport_wczytania.append({"plik": plik, "status": "ok", "wiersze": len(ruch)})
+            else:
+                if wpis.get("wiersz") is None:
+                    self.raport_wczytania.append({"plik": plik, "status": "pominiety", "powod": wpis.get("powod"),
+                                                  "cache": True})
+                    continue
+                ruch = macierz_cache[wpis["wiersz"]]
+                self.raport_wczytania.append({"plik": plik, "status": "ok", "wiersze": wpis.get("wiersze"),
+                                              "cache": True})
+            # Krótsze dni są dopełniane zerami, dłuższe przycinane do doby
+            self._dodaj_dzien_zrodla(ruch, zrodlo=plik, data=data_z_nazwy(plik))
+            wpis["wiersz"] = licznik
+            licznik += 1
+        zglos_postep(postep, None, len(wpisy), len(wpisy), "pliki wczytane")
+
+    def _raport_z_wpisow(self, wpisy, z_cache=False):
+        licznik = 0
+        for wpis in wpisy:
+            if wpis.get("wiersz") is None:
+                self.raport_wczytania.append({"plik": wpis["plik"], "status": "pominiety", "powod": wpis.get("powod"),
+                                              "cache": z_cache})
+            else:
+                self.raport_wczytania.append({"plik": wpis["plik"], "status": "ok", "wiersze": wpis.get("wiersze"),
+                                              "cache": z_cache})
+                licznik += 1
+        return licznik
+
+    @mierzona("wczytaj_cdr")
+    def wczytaj_cdr(self, zrodlo, kolumna_startu=KOLUMNA_STARTU, kolumna_czasu=KOLUMNA_CZASU, kolumna_encji=None,
+                    rozmiar_paczki=PACZKA_CDR, strefa=None, postep=None, anuluj=None):
+        """ Profile minutowe wprost z rekordów połączeń (CSV/JSONL); z kolumną encji wynik trafia do tensora encji
+
+        strefa: strefa czasowa (np. 'Europe/Warsaw') dla startów zapisanych jako epoka; domyślnie systemowa.
+        """
+        self.wyczysc_dane()
+        try:
+            pliki = pliki_cdr(zrodlo)
+            if not pliki: return False, "Brak plików CDR."
+            akumulator = AkumulatorCDR()
+            for i, sciezka in enumerate(pliki):
+                zglos_postep(postep, anuluj, i, len(pliki), "pliki CDR")
+                przed = akumulator.rekordy
+                try:
+                    with self.pomiary.etap("CDR: odczyt i akumulacja", plik=os.path.basename(sciezka)) as etap:
+                        for paczka in czytaj_cdr(sciezka, kolumna_startu, kolumna_czasu, kolumna_encji,
+                                                 rozmiar_paczki, strefa):
+                            akumulator.dodaj(*paczka)
+                            zglos_postep(None, anuluj, i, len(pliki), "pliki CDR")
+                        etap.ustaw(rekordy=akumulator.rekordy - przed)
+                except (OSError, ValueError) as e:
+                    self.raport_wczytania.append({"plik": os.path.basename(sciezka), "status": "pominiety",
+                                                  "powod": f"{type(e).__name__}: {e}"})
+                    continue
+                self.raport_wczytania.append({"plik": os.path.basename(sciezka), "status": "ok",
+                                              "wiersze": akumulator.rekordy - przed})
+            zglos_postep(postep, None, len(pliki), len(pliki), "pliki CDR")
+
+            dni = akumulator.dni()
+            if not dni: return False, "Brak poprawnych rekordów połączeń."
+            with self.pomiary.etap("CDR: profile z tablicy różnic", dni=len(dni)):
+                tensor = akumulator.tensor().astype(self.magazyn.dtype, copy=False)
+            if kolumna_encji:
+                self.ustaw_encje(tensor, akumulator.encje())
+            else:
+                self.magazyn.dodaj_dni(tensor[0], zrodla=[f"CDR {d.isoformat()}" for d in dni], daty=dni)
+            komunikat = f"Wczytano {akumulator.rekordy - akumulator.odrzucone} połączeń, {len(dni)} dni."
+            if akumulator.odrzucone: komunikat += f" Odrzucono {akumulator.odrzucone} rekordów."
+            return True, komunikat
+        except Anulowano:
+            self.wyczysc_dane()
+            return False, "Anulowano."
+        except Exception as e:
+            return False, f"Błąd odczytu: {str(e)}"
+
+    def ustaw_encje(self, tensor, encje=None):
+        """ Dane wielu encji naraz: tensor (encje x dni x 1440) i opcjonalne identyfikatory encji """
+        if tensor.ndim != 3 or tensor.shape[2] != MINUT_NA_DOBE:
+            raise ValueError(f"Oczekiwano tensora (encje x dni x {MINUT_NA_DOBE}), otrzymano {tensor.shape}")
+        self.tensor_encji = tensor
+        self.encje = list(encje) if encje is not None else list(range(len(tensor)))
+
+    def wczytaj_folder_csv_encji(self, sciezka_folderu, kolumna_encji=KOLUMNA_ENCJI, robotnicy=None):
+        import pandas as pd
+        self.tensor_encji = None
+        self.encje = []
+        self.raport_wczytania = []
+        try:
+            pliki = sorted(f for f in os.listdir(sciezka_folderu) if f.endswith('.csv'))
+            if not pliki: return False, "Brak plików CSV w tym folderze."
+            sciezki = [os.path.join(sciezka_folderu, plik) for plik in pliki]
+            with ThreadPoolExecutor(max_workers=robotnicy) as pula:
+                wyniki = list(pula.map(partial(parsuj_plik_csv_encji, kolumna_encji=kolumna_encji), sciezki))
+
+            dni = []
+            for plik, (dane, powod) in zip(pliki, wyniki):
+                if dane is None:
+                    self.raport_wczytania.append({"plik": plik, "status": "pominiety", "powod": powod})
+                    continue
+                self.raport_wczytania.append({"plik": plik, "status": "ok", "wiersze": len(dane[2])})
+                dni.append(dane)
+            if not dni: return False, "Brak poprawnych plików CSV."
+
+            encje = pd.Index(pd.unique(np.concatenate([ids for ids, _, _ in dni])))
+            tensor = np.zeros((len(encje), len(dni), MINUT_NA_DOBE), dtype=self.magazyn.dtype)
+            for d, (ids, minuty, ruch) in enumerate(dni):
+                # Minuty ponad 1440 są odcinane, brakujące zostają zerami (jak przy jednej serii)
+                w_dobie = minuty < MINUT_NA_DOBE
+                tensor[encje.get_indexer(ids[w_dobie]), d, minuty[w_dobie]] = ruch[w_dobie]
+            self.ustaw_encje(tensor, encje.tolist())
+            return True, f"Wczytano {len(dni)} plików, {len(encje)} encji."
+        except Exception as e:
+            return False, f"Błąd odczytu: {str(e)}"
+
+    def oblicz_gnr_encji(self, start_h=0, end_h=24, procesy=1):
+        if self.tensor_encji is None: return None
+        return oblicz_gnr_encji(self.tensor_encji, start_h, end_h, self.encje, procesy)
+
+    def oblicz_gnr_poza_pamiecia(self, zrodlo, start_h=0, end_h=24, rozmiar_paczki=PACZKA_DNI):
+        """ TCBH/ADPH/FDMH dla archiwum większego niż RAM
+
+        zrodlo: plik .npy, folder z cache (.traffic_cache/dni.npy) albo lista takich ścieżek (kolejne dni).
+        """
+        sciezki = zrodlo if isinstance(zrodlo, (list, tuple)) else [zrodlo]
+        macierze = []
+        for sciezka in sciezki:
+            if os.path.isdir(sciezka): sciezka = os.path.join(katalog_cache_folderu(sciezka), _PLIK_MACIERZY)
+            macierze.append(np.load(sciezka, mmap_mode='r'))
+        return oblicz_gnr_strumieniowo(macierze, start_h, end_h, rozmiar_paczki)
+
+    def wymiaruj(self, start_h=0, end_h=24, gos=GOS_DOMYSLNY, cel_oczekiwania=None, czas_obslugi=None,
+                 czas_oczekiwania=0):
+        """ Wynik oblicz_gnr uzupełniony o wymiarowanie (klucz "wymiarowanie") """
+        wynik = self.oblicz_gnr(start_h, end_h)
+        if wynik is None: return None
+        wynik["wymiarowanie"] = wymiaruj(wynik, gos, cel_oczekiwania, czas_obslugi, czas_oczekiwania)
+        return wynik
+
+    def wymiaruj_encje(self, start_h=0, end_h=24, gos=GOS_DOMYSLNY, cel_oczekiwania=None, czas_obslugi=None,
+                       czas_oczekiwania=0, procesy=1):
+        """ Tabela oblicz_gnr_encji z liczbą łączy dla TCBH i górnej granicy każdej encji """
+        tabela = self.oblicz_gnr_encji(start_h, end_h, procesy)
+        if tabela is None: return None
+        for przyrostek, obciazenia in (("", tabela["tcbh_val"]), ("_gorne", tabela["tcbh_val"] + tabela["error_margin"])):
+            for klucz, wartosci in wymiaruj_obciazenia(obciazenia.to_numpy(), gos, cel_oczekiwania, czas_obslugi,
+                                                       czas_oczekiwania).items():
+                tabela[klucz + przyrostek] = wartosci
+        return tabela
+
+    def oblicz_gnr_bootstrap(self, start_h=0, end_h=24, liczba_prob=PROBY_BOOTSTRAPU, ufnosc=0.95, seed=None,
+                             procesy=1):
+        """ Wynik oblicz_gnr uzupełniony o przedziały bootstrapowe (klucz "bootstrap") """
+        wynik = self.oblicz_gnr(start_h, end_h)
+        if wynik is None: return None
+        skumulowane = self.indeks().skumulowane
+        if len(skumulowane) != len(self.magazyn):
+            # Tryb na żywo: indeks nie zawiera jeszcze dnia w trakcie
+            skumulowane = sumy_skumulowane(self.magazyn.macierz)
+        wynik["bootstrap"] = bootstrap_gnr(skumulowane, start_h, end_h, liczba_prob, ufnosc, seed, procesy)
+        return wynik
+
+    def oblicz_gnr(self, start_h=0, end_h=24):
+        if len(self.magazyn) == 0: return None
+
+        with self.pomiary.operacja("oblicz_gnr", dni=len(self.magazyn), od=start_h, do=end_h):
+            # Najgrubszy dokładny poziom piramidy - dla danych minutowych i drobniejszych zawsze minuty
+            indeks = self._indeks_poziomu(poziom_analizy(self.szerokosc_s, start_h, end_h))
+            indeks.pomiary = self.pomiary
+            wynik = indeks.oblicz(start_h, end_h)
+        if wynik is None: return None
+        self.tcbh_start_index = wynik["tcbh_start"]
+        wynik = dict(wynik)
+        raport = self.pomiary.raport("oblicz_gnr")
+        if raport is not None: wynik["czasy"] = raport
+        return wynik
@@ -0,0 +1,228 @@
+import numpy as np
+import matplotlib.ticker as ticker
+from matplotlib.collections import LineCollection
+from matplotlib.patches import Rectangle
+
+from silnik import BEZ_POMIAROW, MINUT_NA_DOBE, OKNO_GODZINY, Piramida
+
+# Od tylu dni zamiast pojedynczych krzywych rysowane jest pasmo percentyli p5-p95
+PROG_PASMA = 365
+
+
+def decymuj(macierz, szerokosc_px, x0=1.0, krok=1.0):
+    """ Zmniejsza liczbę punktów krzywych do szerokości wykresu w pikselach (min/max w każdym pikselu)
+
+    Zwraca (x, y) - y ma kształt (dni, punkty). Obwiednia szczytów jest zachowana.
+    Kolumna i macierzy leży na osi x w x0 + i * krok (domyślnie minuty 1..1440).
+    """
+    punkty = macierz.shape[1]
+    x = x0 + np.arange(punkty, dtype=np.float64) * krok
+    szerokosc_px = max(1, int(szerokosc_px))
+    if punkty <= szerokosc_px: return x, macierz
+
+    k = -(-punkty // szerokosc_px)
+    kubelki = -(-punkty // k)
+    pelne = np.empty((len(macierz), kubelki * k), dtype=macierz.dtype)
+    pelne[:, :punkty] = macierz
+    pelne[:, punkty:] = macierz[:, -1:]
+    pelne = pelne.reshape(len(macierz), kubelki, k)
+
+    y = np.empty((len(macierz), kubelki, 2), dtype=macierz.dtype)
+    pelne.min(axis=2, out=y[:, :, 0])
+    pelne.max(axis=2, out=y[:, :, 1])
+    srodki = x0 + (np.arange(kubelki) * k + (k - 1) / 2) * krok
+    return np.repeat(srodki, 2), y.reshape(len(macierz), 2 * kubelki)
+
+
+class WykresProfilu:
+    """ Wykres profilu ruchu niezależny od Tk - działa też na płótnie Agg (tryb bez GUI)
+
+    Krzywe dni, pasmo percentyli i średni profil są budowane raz na wczytanie danych;
+    zmiana TCBH albo zakresu OD-DO tylko przesuwa znaczniki i odrysowuje je na zapamiętanym tle (blitting).
+    Dane krzywych pochodzą z poziomu piramidy rozdzielczości dobranego do widocznego zakresu osi x
+    (zoom paska narzędzi), przyciętego do tego zakresu.
+    """
+    pomiary = BEZ_POMIAROW
+
+    def __init__(self, fig, ax, tryb='auto'):
+        self.fig = fig
+        self.ax = ax
+        self.tryb = tryb
+        self._magazyn = None
+        self._wersja = None
+        self._szerokosc_px = None
+        self._dni = None
+        self._piramida = None
+        self._poziom = None
+        self._widok = None
+        self._pasmo = None
+        self._mediana = None
+        self._srednia = None
+        self._span_tcbh = None
+        self._linie_zakresu = []
+        self._tlo = None
+        fig.canvas.mpl_connect('resize_event', self._po_zmianie_rozmiaru)
+        fig.canvas.mpl_connect('draw_event', self._po_rysowaniu)
+
+    def komunikat(self, tekst):
+        self._magazyn = None
+        self._span_tcbh = None
+        self._linie_zakresu = []
+        self.ax.clear()
+        self.ax.text(0.5, 0.5, tekst, ha='center', va='center', color='#666666', fontsize=18, fontweight='bold')
+        self.ax.set_axis_off()
+        self.fig.canvas.draw_idle()
+
+    def rysuj(self, magazyn, tcbh_start, start_h, end_h, piramida=None):
+        """ piramida: poziomy rozdzielczości danych (TrafficEngine.piramida()); bez niej - tylko poziomy z minut """
+        pomiary = self.pomiary
+        with pomiary.operacja("wykres", dni=len(magazyn)):
+            przebudowa = self._magazyn is not magazyn or self._wersja != magazyn.wersja
+            if przebudowa:
+                with pomiary.etap("budowa krzywych"):
+                    self._zbuduj(magazyn, piramida)
+            self._ustaw_znaczniki(tcbh_start, start_h, end_h)
+
+            canvas = self.fig.canvas
+            if przebudowa or self._tlo is None or not getattr(canvas, 'supports_blit', False):
+                # Przy pomiarach rysowanie synchroniczne - draw_idle odłożyłoby koszt poza mierzony etap
+                with pomiary.etap("pełne odrysowanie"):
+                    canvas.draw() if pomiary else canvas.draw_idle()
+            else:
+                with pomiary.etap("blitting znaczników"):
+                    canvas.restore_region(self._tlo)
+                    self._rysuj_znaczniki()
+                    canvas.blit(self.fig.bbox)
+
+    def _znaczniki(self):
+        return ([self._span_tcbh] if self._span_tcbh is not None else []) + self._linie_zakresu
+
+    def _rysuj_znaczniki(self):
+        for artysta in self._znaczniki():
+            self.fig.draw_artist(artysta)
+
+    def _po_rysowaniu(self, event):
+        # Pełne odrysowanie (nowe dane, zoom, zmiana rozmiaru): tło bez znaczników do późniejszego blittingu
+        canvas = self.fig.canvas
+        if getattr(canvas, 'supports_blit', False):
+            self._tlo = canvas.copy_from_bbox(self.fig.bbox)
+        self._rysuj_znaczniki()
+
+    def _szerokosc_osi(self):
+        return self.ax.get_window_extent().width
+
+    def _tryb_pasma(self, liczba_dni):
+        return self.tryb == 'pasmo' or (self.tryb == 'auto' and liczba_dni >= PROG_PASMA)
+
+    def _zbuduj(self, magazyn, piramida=None):
+        self._magazyn = None  # Zmiana zakresu osi w trakcie budowy nie przelicza krzywych
+        self._wersja = magazyn.wersja
+        macierz = magazyn.macierz
+        self._piramida = piramida if piramida is not None else Piramida(macierz)
+
+        ax = self.ax
+        ax.clear()
+        # clear() zeruje też rejestr zdarzeń osi
+        ax.callbacks.connect('xlim_changed', self._po_zmianie_zakresu)
+        ax.set_axis_on()
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        ax.spines['bottom'].set_color('#555555')
+        ax.spines['left'].set_color('#555555')
+        ax.tick_params(axis='both', colors='#cccccc', labelsize=10)
+
+        self._dni = None
+        self._pasmo = None
+        self._mediana = None
+        self._srednia = None
+        self._poziom = None
+        if len(macierz):
+            ax.set_xlim(-MINUT_NA_DOBE * 0.05, MINUT_NA_DOBE * 1.05)
+            if self._tryb_pasma(len(macierz)):
+                self._mediana, = ax.plot([], [], color='#dddddd', linewidth=1.0, alpha=0.8, label='Mediana dni')
+            else:
+                self._dni = LineCollection([], colors='#aaaaaa', alpha=0.15, linewidths=0.8)
+                ax.add_collection(self._dni)
+            self._srednia, = ax.plot([], [], color='#00e5ff', linewidth=2.5, label='Średni Profil')
+            self._aktualizuj_dane()
+            # Skala y z pełnej doby; przy zoomie pasek narzędzi ustawia ją sam
+            ax.relim()
+            ax.autoscale_view(scalex=False)
+        self._magazyn = magazyn
+
+        self._tlo = None
+        self._span_tcbh = Rectangle((0, 0), OKNO_GODZINY, 1, transform=ax.get_xaxis_transform(),
+                                    color='#ff0055', alpha=0.2, label='TCBH (1h)', animated=True)
+        ax.add_patch(self._span_tcbh)
+        self._linie_zakresu = [ax.axvline(0, color='yellow', linestyle='--', alpha=0.5, visible=False,
+                                          animated=True)
+                               for _ in range(2)]
+
+        ax.set_title("Profil Ruchu (Aggregate Traffic Profile)", color="white", fontsize=14, pad=20,
+                     fontweight='bold')
+        ax.set_xlabel("Godzina doby", color="#aaaaaa", fontsize=11)
+        ax.set_ylabel("Natężenie [Erl]", color="#aaaaaa", fontsize=11)
+        ax.xaxis.set_major_locator(ticker.MultipleLocator(120))
+        ax.xaxis.set_major_formatter(ticker.FuncFormatter(lambda x, pos: f'{int(x / 60):02d}:00'))
+        ax.grid(True, linestyle=':', alpha=0.4, color='#666666', zorder=0)
+        ax.legend(fontsize=10, facecolor='#212121', edgecolor='#212121', labelcolor='white', frameon=False)
+
+    def _zakres_widoku(self):
+        """ (poziom piramidy [s], pierwszy i ostatni+1 widoczny bin tego poziomu) dla bieżących granic osi x """
+        x_min, x_max = self.ax.get_xlim()
+        x_min, x_max = max(0.0, x_min), min(float(MINUT_NA_DOBE), x_max)
+        szerokosc = self._piramida.do_wykresu(max(x_max - x_min, 1.0), self._szerokosc_osi())
+        krok = szerokosc / 60
+        biny = self._piramida.poziom(szerokosc).shape[1]
+        # Bin i kończy się w minucie (i + 1) * krok - jak minuta i na osi 1..1440
+        od = max(0, int(x_min / krok) - 1)
+        do = min(biny, int(np.ceil(x_max / krok)) + 1)
+        if do <= od: od, do = 0, biny
+        return szerokosc, od, do
+
+    def _aktualizuj_dane(self):
+        """ Krzywe z poziomu piramidy dobranego do zakresu osi x, tylko dla widocznych binów (z zapasem) """
+        self._szerokosc_px = self._szerokosc_osi()
+        szerokosc, od, do = self._zakres_widoku()
+        macierz = self._piramida.poziom(szerokosc)
+        # Zapas szerokości widoku z obu stron - przesuwanie wykresu nie przelicza krzywych przy każdym ruchu
+        zapas = do - od
+        od, do = max(0, od - zapas), min(macierz.shape[1], do + zapas)
+        self._poziom = szerokosc
+        self._widok = (od, do)
+        krok = szerokosc / 60
+        widok = macierz[:, od:do]
+        x = (np.arange(od, do) + 1) * krok
+
+        if self._dni is not None:
+            xs, y = decymuj(widok, self._szerokosc_px * len(x) / max(1, zapas), x0=x[0], krok=krok)
+            segmenty = np.empty(y.shape + (2,))
+            segmenty[:, :, 0] = xs
+            segmenty[:, :, 1] = y
+            self._dni.set_segments(segmenty)
+        if self._mediana is not None:
+            p5, p50, p95 = np.percentile(widok, [5, 50, 95], axis=0)
+            if self._pasmo is not None: self._pasmo.remove()
+            self._pasmo = self.ax.fill_between(x, p5, p95, color='#aaaaaa', alpha=0.25, linewidth=0,
+                                               label='Dni (p5-p95)')
+            self._mediana.set_data(x, p50)
+        self._srednia.set_data(x, widok.mean(axis=0))
+
+    def _ustaw_znaczniki(self, tcbh_start, start_h, end_h):
+        self._span_tcbh.set_x(tcbh_start)
+        bramkowanie = start_h > 0 or end_h < 24
+        for linia, godzina in zip(self._linie_zakresu, (start_h, end_h)):
+            linia.set_xdata([int(godzina * 60)] * 2)
+            linia.set_visible(bramkowanie)
+
+    def _po_zmianie_rozmiaru(self, event):
+        if self._dni is None or self._magazyn is None: return
+        if abs(self._szerokosc_osi() - self._szerokosc_px) >= 1:
+            self._aktualizuj_dane()
+
+    def _po_zmianie_zakresu(self, ax):
+        # Zoom/przesunięcie paska narzędzi: inny poziom piramidy albo widok poza przeliczonym wycinkiem
+        if self._magazyn is None or self._srednia is None: return
+        szerokosc, od, do = self._zakres_widoku()
+        if szerokosc == self._poziom and self._widok[0] <= od and do <= self._widok[1]: return
+        self._aktualizuj_dane()